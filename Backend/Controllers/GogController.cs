@@ -472,6 +472,33 @@ public class GogController : ControllerBase
         }
     }
 
+    /// <summary>
+    /// 获取GOG导入任务的进度(导入进行中时可轮询,结束后返回导入结果)
+    /// </summary>
+    /// <param name="taskId">导入时返回的任务ID</param>
+    [HttpGet("import/progress/{taskId}")]
+    [ProducesResponseType(typeof(ApiResponse<GogImportResponseDto>), StatusCodes.Status200OK)]
+    [ProducesResponseType(typeof(ApiResponse<object>), StatusCodes.Status404NotFound)]
+    public async Task<ActionResult<ApiResponse<GogImportResponseDto>>> GetImportProgress(string taskId)
+    {
+        try
+        {
+            var result = await _gogService.GetImportProgress(taskId);
+
+            if (result == null)
+            {
+                return NotFound(ApiResponse<object>.ErrorResponse("ERR_NOT_FOUND", "暂无采集进度"));
+            }
+
+            return Ok(ApiResponse<GogImportResponseDto>.SuccessResponse(result));
+        }
+        catch (Exception ex)
+        {
+            _logger.LogError(ex, "获取GOG采集进度时发生错误");
+            return StatusCode(500, ApiResponse<GogImportResponseDto>.ErrorResponse("ERR_INTERNAL", "服务器内部错误"));
+        }
+    }
+
     /// <summary>
     /// 获取GOG用户信息
     /// </summary>
@@ -460,6 +460,33 @@ public class XboxController : ControllerBase
         }
     }
 
+    /// <summary>
+    /// 获取Xbox导入任务的进度（导入进行中时可轮询，结束后返回导入结果）
+    /// </summary>
+    /// <param name="taskId">导入时返回的任务ID</param>
+    [HttpGet("import/progress/{taskId}")]
+    [ProducesResponseType(typeof(ApiResponse<XboxImportResponseDto>), StatusCodes.Status200OK)]
+    [ProducesResponseType(typeof(ApiResponse<object>), StatusCodes.Status404NotFound)]
+    public async Task<ActionResult<ApiResponse<XboxImportResponseDto>>> GetImportProgress(string taskId)
+    {
+        try
+        {
+            var result = await _xboxService.GetImportProgress(taskId);
+
+            if (result == null)
+            {
+                return NotFound(ApiResponse<object>.ErrorResponse("ERR_NOT_FOUND", "暂无采集进度"));
+            }
+
+            return Ok(ApiResponse<XboxImportResponseDto>.SuccessResponse(result));
+        }
+        catch (Exception ex)
+        {
+            _logger.LogError(ex, "获取Xbox采集进度时发生错误");
+            return StatusCode(500, ApiResponse<XboxImportResponseDto>.ErrorResponse("ERR_INTERNAL", "服务器内部错误"));
+        }
+    }
+
     /// <summary>
     /// 获取Xbox用户信息
     /// </summary>
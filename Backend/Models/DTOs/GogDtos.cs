@@ -38,7 +38,7 @@ public class GogImportResponseDto
     public string TaskId { get; set; } = string.Empty;
 
     /// <summary>
-    /// 状态: processing, completed, failed
+    /// 状态: processing, completed, partial(截止时间内未获取全部游戏), failed
     /// </summary>
     [JsonPropertyName("status")]
     public string Status { get; set; } = string.Empty;
@@ -78,6 +78,12 @@ public class GogImportItemsDto
     /// </summary>
     [JsonPropertyName("achievements")]
     public int Achievements { get; set; }
+
+    /// <summary>
+    /// 截止时间内未获取的游戏数量(重新导入时从断点继续)
+    /// </summary>
+    [JsonPropertyName("pending")]
+    public int Pending { get; set; }
 }
 
 /// <summary>
@@ -1,5 +1,6 @@
 using Microsoft.AspNetCore.Authentication.JwtBearer;
 using Microsoft.EntityFrameworkCore;
+using Microsoft.Extensions.FileProviders;
 using Microsoft.IdentityModel.Tokens;
 using Microsoft.OpenApi.Models;
 using PlayLinker.Data;
@@ -139,6 +140,16 @@ app.UseSwaggerUI(c =>
 });
 
 app.UseCors("AllowAll");
+
+// 采集脚本下载到本地的游戏图片和头像 (Backend/Cache/assets)
+var assetsPath = Path.Combine(app.Environment.ContentRootPath, "Cache", "assets");
+Directory.CreateDirectory(assetsPath);
+app.UseStaticFiles(new StaticFileOptions
+{
+    FileProvider = new PhysicalFileProvider(assetsPath),
+    RequestPath = "/assets"
+});
+
 app.UseAuthentication();
 app.UseAuthorization();
 app.MapControllers();
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成就定义共享缓存
+成就定义(名称、描述、图标等)对所有用户相同,按平台和产品ID缓存在本地共享目录中;
+用户相关的解锁数据单独按用户保存
+"""
+
+import os
+import json
+import time
+import tempfile
+from typing import Dict, Any, Optional
+
+# 默认缓存目录: Backend/Cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Cache")
+
+# 成就定义默认有效期(秒),过期后以下一次拉取结果为准重新写入
+DEFAULT_DEFINITIONS_TTL = 7 * 24 * 3600
+
+
+def _write_json_atomic(path: str, data: Any):
+    """
+    原子写入JSON文件,避免多个采集进程同时读写时读到半截文件
+
+    Args:
+        path: 目标文件路径
+        data: 要写入的数据
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json(path: str) -> Optional[Any]:
+    """读取JSON文件,文件不存在或损坏时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class AchievementCache:
+    """
+    成就缓存
+
+    目录结构:
+        {cache_dir}/achievements/{platform}/{product_id}.json   共享的成就定义
+        {cache_dir}/achievements/{platform}/users/{user_id}.json 用户的解锁数据
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_DEFINITIONS_TTL):
+        self.root = os.path.join(cache_dir, "achievements")
+        self.ttl = ttl
+        self._user_unlocks: Dict[str, Dict[str, Any]] = {}
+
+    def _definitions_path(self, platform: str, product_id: str) -> str:
+        return os.path.join(self.root, platform, f"{product_id}.json")
+
+    def _unlocks_path(self, platform: str, user_id: str) -> str:
+        return os.path.join(self.root, platform, "users", f"{user_id}.json")
+
+    def get_definitions(self, platform: str, product_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取未过期的成就定义
+
+        Args:
+            platform: 平台名称(gog/xbox)
+            product_id: 产品ID
+
+        Returns:
+            成就定义字典,不存在或已过期返回None
+        """
+        entry = _read_json(self._definitions_path(platform, str(product_id)))
+        if not entry or "definitions" not in entry:
+            return None
+        if time.time() - entry.get("fetchedAt", 0) > self.ttl:
+            return None
+        return entry["definitions"]
+
+    def put_definitions(self, platform: str, product_id: str, definitions: Dict[str, Any]):
+        """
+        写入成就定义,内容未变化且未过期时不重复写盘
+
+        Args:
+            platform: 平台名称(gog/xbox)
+            product_id: 产品ID
+            definitions: 成就定义字典
+        """
+        if self.get_definitions(platform, product_id) == definitions:
+            return
+        _write_json_atomic(self._definitions_path(platform, str(product_id)), {
+            "fetchedAt": time.time(),
+            "definitions": definitions
+        })
+
+    def load_unlocks(self, platform: str, user_id: str) -> Dict[str, Any]:
+        """
+        读取用户上次保存的全部解锁数据
+
+        Returns:
+            {product_id: 解锁数据} 字典
+        """
+        key = f"{platform}/{user_id}"
+        if key not in self._user_unlocks:
+            self._user_unlocks[key] = _read_json(self._unlocks_path(platform, str(user_id))) or {}
+        return self._user_unlocks[key]
+
+    def set_unlocks(self, platform: str, user_id: str, product_id: str, unlocks: Any):
+        """记录单个产品的用户解锁数据(调用save_unlocks后落盘)"""
+        self.load_unlocks(platform, user_id)[str(product_id)] = unlocks
+
+    def save_unlocks(self, platform: str, user_id: str):
+        """将用户的解锁数据写入磁盘"""
+        key = f"{platform}/{user_id}"
+        if key in self._user_unlocks:
+            _write_json_atomic(self._unlocks_path(platform, str(user_id)), self._user_unlocks[key])
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+游戏图片和头像本地缓存
+并发下载采集结果中的远程图片,按内容哈希保存到本地(相同内容只保存一份),
+生成缩略图,并将记录中的图片地址改写为本地地址
+"""
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Iterable, Tuple
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# 默认缓存目录: Backend/Cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Cache")
+
+# 后端以该路径对外提供 Cache/assets 目录
+DEFAULT_BASE_URL = "/assets"
+
+# 默认缩略图尺寸(最长边像素)
+DEFAULT_THUMBNAIL_SIZES = (96, 320)
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+
+def print_info(message):
+    """打印信息"""
+    print(f"INFO: {message}", file=sys.stderr, flush=True)
+
+
+def print_error(message):
+    """打印错误"""
+    print(f"ERROR: {message}", file=sys.stderr, flush=True)
+
+
+def normalize_url(url: str) -> str:
+    """补全协议相对地址(GOG图片常以 // 开头)"""
+    return f"https:{url}" if url.startswith("//") else url
+
+
+class AssetCache:
+    """
+    内容寻址的图片缓存
+
+    目录结构:
+        {cache_dir}/assets/{hash[:2]}/{hash}{ext}          原图
+        {cache_dir}/assets/{hash[:2]}/{hash}_{size}{ext}   缩略图
+        {cache_dir}/assets/urls.json                       远程地址到本地文件的映射
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, base_url: str = DEFAULT_BASE_URL,
+                 thumbnail_sizes: Iterable[int] = DEFAULT_THUMBNAIL_SIZES, workers: int = 8):
+        self.root = os.path.join(cache_dir, "assets")
+        self.base_url = base_url.rstrip("/")
+        self.thumbnail_sizes = tuple(thumbnail_sizes)
+        self.workers = workers
+        self.index_path = os.path.join(self.root, "urls.json")
+        self.index = self._load_index()
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if Image is None and self.thumbnail_sizes:
+            print_info("未安装Pillow,跳过缩略图生成(pip install Pillow)")
+
+    def _load_index(self) -> Dict[str, str]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        """合并其他进程写入的映射后原子保存"""
+        os.makedirs(self.root, exist_ok=True)
+        merged = self._load_index()
+        merged.update(self.index)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.index = merged
+
+    def _local_url(self, name: str) -> str:
+        return f"{self.base_url}/{name[:2]}/{name}"
+
+    def _describe(self, name: str) -> Dict[str, Any]:
+        """本地文件名对应的地址和缩略图地址"""
+        stem, ext = os.path.splitext(name)
+        thumbnails = {}
+        for size in self.thumbnail_sizes:
+            thumb_name = f"{stem}_{size}{ext}"
+            if os.path.exists(os.path.join(self.root, thumb_name[:2], thumb_name)):
+                thumbnails[str(size)] = self._local_url(thumb_name)
+        return {"url": self._local_url(name), "thumbnails": thumbnails}
+
+    def _write_thumbnails(self, path: str):
+        """生成各尺寸的缩略图(需要Pillow)"""
+        if Image is None:
+            return
+        stem, ext = os.path.splitext(path)
+        try:
+            with Image.open(path) as image:
+                for size in self.thumbnail_sizes:
+                    thumb_path = f"{stem}_{size}{ext}"
+                    if os.path.exists(thumb_path):
+                        continue
+                    thumb = image.copy()
+                    thumb.thumbnail((size, size))
+                    if ext == ".jpg" and thumb.mode not in ("RGB", "L"):
+                        thumb = thumb.convert("RGB")
+                    thumb.save(thumb_path)
+        except Exception as e:
+            print_error(f"生成缩略图失败 {path}: {e}")
+
+    def _download(self, url: str) -> Tuple[str, Optional[str]]:
+        """下载单个图片,返回(远程地址, 本地文件名),失败时文件名为None"""
+        try:
+            response = self.session.get(normalize_url(url), timeout=30)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print_error(f"下载图片失败 {url}: {e}")
+            return url, None
+
+        content = response.content
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+        ext = CONTENT_TYPE_EXTENSIONS.get(content_type)
+        if not ext:
+            ext = os.path.splitext(url.split("?")[0])[1].lower() or ".jpg"
+
+        name = hashlib.sha256(content).hexdigest() + ext
+        directory = os.path.join(self.root, name[:2])
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        self._write_thumbnails(path)
+        return url, name
+
+    def localize(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        确保所有图片都已保存到本地
+
+        Args:
+            urls: 远程图片地址
+
+        Returns:
+            {远程地址: {"url": 本地地址, "thumbnails": {尺寸: 本地地址}}},下载失败的地址不包含在内
+        """
+        unique = [url for url in dict.fromkeys(urls) if url]
+        missing = [
+            url for url in unique
+            if url not in self.index
+            or not os.path.exists(os.path.join(self.root, self.index[url][:2], self.index[url]))
+        ]
+
+        if missing:
+            print_info(f"下载图片: {len(missing)} 个(已缓存 {len(unique) - len(missing)} 个)")
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for url, name in pool.map(self._download, missing):
+                    if name:
+                        self.index[url] = name
+            self._save_index()
+
+        return {url: self._describe(self.index[url]) for url in unique if url in self.index}
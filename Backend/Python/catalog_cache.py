@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+游戏目录元数据缓存
+以SQLite保存与用户无关的游戏元数据(GOG gameDetails、Xbox详情/图片/类型等),
+按(平台, 游戏ID)索引,供所有用户和所有采集脚本共享
+"""
+
+import os
+import json
+import time
+import sqlite3
+from typing import Dict, Any, Optional, Iterable
+
+# 默认缓存目录: Backend/Cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Cache")
+
+# 元数据默认有效期(秒)
+DEFAULT_CATALOG_TTL = 7 * 24 * 3600
+
+# 最多保留的条目数,超出后淘汰最久未访问的条目
+DEFAULT_MAX_ENTRIES = 50000
+
+# SQLite单条语句的参数个数上限较低,批量查询时分块
+_QUERY_CHUNK_SIZE = 500
+
+
+class CatalogCache:
+    """基于SQLite的游戏目录元数据缓存"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_CATALOG_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "catalog.sqlite3")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # 多个采集进程可能同时访问同一个数据库
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS catalog (
+                platform TEXT NOT NULL,
+                game_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (platform, game_id)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_accessed ON catalog (accessed_at)")
+        self.conn.commit()
+
+    def get(self, platform: str, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取单个游戏的未过期元数据
+
+        Args:
+            platform: 平台名称(gog/xbox)
+            game_id: 游戏ID
+
+        Returns:
+            元数据字典,不存在或已过期返回None
+        """
+        return self.get_many(platform, [game_id]).get(str(game_id))
+
+    def get_many(self, platform: str, game_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取未过期的元数据
+
+        Args:
+            platform: 平台名称(gog/xbox)
+            game_ids: 游戏ID列表
+
+        Returns:
+            {game_id: 元数据} 字典,只包含命中的条目
+        """
+        ids = list(dict.fromkeys(str(game_id) for game_id in game_ids))
+        now = time.time()
+        found = {}
+
+        for start in range(0, len(ids), _QUERY_CHUNK_SIZE):
+            chunk = ids[start:start + _QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT game_id, data FROM catalog "
+                f"WHERE platform = ? AND fetched_at >= ? AND game_id IN ({placeholders})",
+                [platform, now - self.ttl] + chunk
+            ).fetchall()
+            for game_id, data in rows:
+                found[game_id] = json.loads(data)
+
+        if found:
+            self.conn.executemany(
+                "UPDATE catalog SET accessed_at = ? WHERE platform = ? AND game_id = ?",
+                [(now, platform, game_id) for game_id in found]
+            )
+            self.conn.commit()
+        return found
+
+    def put(self, platform: str, game_id: str, data: Dict[str, Any]):
+        """写入单个游戏的元数据"""
+        self.put_many(platform, {str(game_id): data})
+
+    def put_many(self, platform: str, items: Dict[str, Dict[str, Any]]):
+        """
+        批量写入元数据,写入后按容量上限淘汰旧条目
+
+        Args:
+            platform: 平台名称(gog/xbox)
+            items: {game_id: 元数据} 字典
+        """
+        if not items:
+            return
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO catalog (platform, game_id, data, fetched_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(platform, str(game_id), json.dumps(data, ensure_ascii=False), now, now)
+             for game_id, data in items.items()]
+        )
+        self.conn.commit()
+        self.prune()
+
+    def prune(self) -> int:
+        """
+        淘汰超出容量上限的最久未访问条目
+
+        Returns:
+            删除的条目数
+        """
+        count = self.conn.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        self.conn.execute(
+            "DELETE FROM catalog WHERE rowid IN "
+            "(SELECT rowid FROM catalog ORDER BY accessed_at ASC LIMIT ?)",
+            (excess,)
+        )
+        self.conn.commit()
+        return excess
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集断点日志
+逐个游戏追加写入已完成的结果和失败的项目(每行一个JSON),进程崩溃、超时或被终止后,
+使用 --resume 重新运行时跳过已完成的工作,只重试失败和尚未开始的项目
+"""
+
+import os
+import json
+import time
+from typing import Dict, Any, List
+
+# 每写入多少条记录同步一次到磁盘
+SYNC_EVERY = 20
+
+# 两次同步到磁盘的最长间隔(秒)
+SYNC_INTERVAL = 5.0
+
+# 超过该时长(秒)未更新的日志不再用于恢复,避免沿用过旧的数据
+MAX_AGE = 6 * 3600
+
+
+def journal_path(cache_dir: str, platform: str, user_id: str) -> str:
+    """默认的断点日志路径"""
+    return os.path.join(cache_dir, "state", "journal", f"{platform}_{user_id}.ndjson")
+
+
+class CheckpointJournal:
+    """
+    断点日志
+
+    每条记录为 {"id", "stage", "status": "done"|"failed", "data" 或 "error"},同一项目同一阶段以最后一条为准;
+    写入时立即flush,并按条数或时间间隔fsync,崩溃时最多丢失最近一个同步周期内的记录
+    """
+
+    def __init__(self, path: str, resume: bool = False, max_age: float = MAX_AGE):
+        """
+        Args:
+            path: 日志文件路径
+            resume: 是否读取已有记录;为False或日志超过max_age时清空旧日志重新开始
+            max_age: 可用于恢复的日志最大时长(秒)
+        """
+        self.path = path
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if resume and self._age() <= max_age:
+            self._load()
+        elif os.path.exists(path):
+            os.remove(path)
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.file = None
+
+    def _age(self) -> float:
+        try:
+            return time.time() - os.stat(self.path).st_mtime
+        except OSError:
+            return float("inf")
+
+    def _load(self):
+        """读取已有记录,忽略崩溃时写了一半的最后一行"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries.setdefault(entry["stage"], {})[str(entry["id"])] = entry
+        except OSError:
+            pass
+
+    def completed(self, stage: str) -> Dict[str, Any]:
+        """已完成的项目: {项目ID: 保存的结果}"""
+        return {
+            item_id: entry.get("data")
+            for item_id, entry in self.entries.get(stage, {}).items()
+            if entry["status"] == "done"
+        }
+
+    def failed(self, stage: str) -> Dict[str, Any]:
+        """上次失败的项目: {项目ID: 错误信息}"""
+        return {
+            item_id: entry.get("error")
+            for item_id, entry in self.entries.get(stage, {}).items()
+            if entry["status"] == "failed"
+        }
+
+    def record(self, item_id: str, stage: str, data: Any):
+        """记录完成的项目"""
+        self._append({"id": str(item_id), "stage": stage, "status": "done", "data": data})
+
+    def fail(self, item_id: str, stage: str, error: Any):
+        """记录失败的项目,下次 --resume 时重试"""
+        self._append({"id": str(item_id), "stage": stage, "status": "failed", "error": error})
+
+    def _append(self, entry: Dict[str, Any]):
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.entries.setdefault(entry["stage"], {})[entry["id"]] = entry
+        self.unsynced += 1
+        if self.unsynced >= SYNC_EVERY or time.monotonic() - self.last_sync >= SYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        """同步到磁盘"""
+        if self.file is not None and self.unsynced:
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def close(self, complete: bool = False):
+        """
+        关闭日志
+
+        Args:
+            complete: 本次采集是否完整;完整且没有失败项目时删除日志,否则保留供 --resume 使用
+        """
+        self.sync()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if complete and not self.summary() and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def summary(self) -> Dict[str, List[str]]:
+        """各阶段失败的项目ID,写入采集结果"""
+        return {stage: sorted(self.failed(stage)) for stage in self.entries if self.failed(stage)}
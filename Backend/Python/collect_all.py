@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多平台统一采集脚本
+在同一个asyncio事件循环中同时采集用户的GOG和Xbox数据,共享截止时间和图片下载线程池,
+输出按平台标记的合并游戏库;总耗时取决于最慢的平台而不是各平台耗时之和
+"""
+
+import sys
+import asyncio
+import argparse
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+
+import gog_get_data
+from asset_cache import AssetCache, DEFAULT_BASE_URL
+from catalog_cache import DEFAULT_CACHE_DIR
+from deadline import Deadline
+from progress_events import ProgressReporter, ProgressSink, result_status
+from library_loader import gog_records, xbox_records
+from result_output import write_result
+
+# xbox-webapi 未安装时 xbox_get_data 会在导入时输出错误并退出,这里只禁用Xbox采集
+with contextlib.redirect_stdout(sys.stderr):
+    try:
+        import xbox_get_data
+    except SystemExit:
+        xbox_get_data = None
+
+# GOG采集(同步请求)使用的线程数
+DEFAULT_WORKERS = 4
+
+
+def print_info(message):
+    """打印信息"""
+    print(f"INFO: {message}", file=sys.stderr, flush=True)
+
+
+def print_error(message):
+    """打印错误"""
+    print(f"ERROR: {message}", file=sys.stderr, flush=True)
+
+
+async def collect_gog(tokens: str, cache_dir: str, use_cache: bool, seconds: Optional[float],
+                      progress: ProgressReporter, resume: bool) -> Dict[str, Any]:
+    """在线程池中运行GOG采集"""
+    deadline = Deadline(seconds)
+    result = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+        gog_get_data.collect, tokens, cache_dir, use_cache, deadline, resume=resume, progress=progress
+    ))
+    return {"result": result, "deadline": deadline}
+
+
+async def collect_xbox(tokens: str, cache_dir: str, use_cache: bool, seconds: Optional[float],
+                       progress: ProgressReporter, resume: bool) -> Dict[str, Any]:
+    """在事件循环中直接运行Xbox采集"""
+    if xbox_get_data is None:
+        return {"result": {
+            "success": False,
+            "error": "xbox-webapi-python 未安装",
+            "message": "请安装: pip install xbox-webapi-python"
+        }}
+    deadline = Deadline(seconds)
+    data, snapshot_key = await xbox_get_data.collect(
+        tokens, cache_dir, use_cache, deadline, progress=progress, resume=resume
+    )
+    return {"result": data, "deadline": deadline, "snapshot_key": snapshot_key}
+
+
+def localize_all(collected: Dict[str, Dict[str, Any]], asset_cache: AssetCache):
+    """使用同一个图片缓存(同一个下载线程池和映射文件)本地化所有平台的图片"""
+    for platform, item in collected.items():
+        if not item["result"].get("success", False):
+            continue
+        if item["deadline"].expired():
+            print_info(f"{platform}: 接近截止时间,跳过图片本地化")
+            continue
+        module = gog_get_data if platform == "gog" else xbox_get_data
+        module.localize_images(item["result"], asset_cache)
+
+
+def save_snapshots(collected: Dict[str, Dict[str, Any]], cache_dir: str):
+    """保存各平台快照,与单独运行采集脚本时相同"""
+    if "gog" in collected:
+        gog_get_data.save_snapshot(cache_dir, collected["gog"]["result"])
+    if "xbox" in collected and collected["xbox"].get("snapshot_key"):
+        store = xbox_get_data.SnapshotStore(cache_dir, "xbox", collected["xbox"]["snapshot_key"])
+        xbox_get_data.save_snapshot(store, collected["xbox"]["result"])
+
+
+def merge_library(results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    将各平台的游戏合并为统一格式的游戏库
+
+    Returns:
+        按最近游玩时间倒序的游戏列表,每项带有 platform 标记
+    """
+    library = []
+    for platform, result in results.items():
+        if not result.get("success", False):
+            continue
+        _, _, records = (gog_records if platform == "gog" else xbox_records)(result)
+        for record in records:
+            library.append({
+                "platform": platform,
+                "id": record["platform_game_id"],
+                "name": record["name"],
+                "image": record["image"],
+                "playTimeMinutes": record["playtime"],
+                "lastPlayed": record["last_played"],
+                "achievements": {
+                    "total": record["achievements_total"],
+                    "unlocked": record["achievements_unlocked"],
+                },
+            })
+    library.sort(key=lambda game: game["lastPlayed"] or "", reverse=True)
+    return library
+
+
+async def collect_all(args) -> Dict[str, Any]:
+    """并发采集所有指定的平台"""
+    # GOG的同步请求和图片下载共用同一个线程池
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.workers))
+
+    # 两个平台的进度写入同一个进度文件,按来源区分
+    sink = ProgressSink(args.progress_file, args.progress)
+    progress = {}
+    tasks = {}
+    if args.gog_tokens:
+        progress["gog"] = ProgressReporter("gog", sink)
+        tasks["gog"] = collect_gog(args.gog_tokens, args.cache_dir, not args.no_cache, args.deadline,
+                                   progress["gog"], args.resume)
+    if args.xbox_tokens:
+        progress["xbox"] = ProgressReporter("xbox", sink)
+        tasks["xbox"] = collect_xbox(args.xbox_tokens, args.cache_dir, not args.no_cache, args.deadline,
+                                     progress["xbox"], args.resume)
+
+    outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    collected = {}
+    for platform, outcome in zip(tasks, outcomes):
+        if isinstance(outcome, BaseException):
+            print_error(f"{platform} 采集失败: {outcome}")
+            outcome = {"result": {"success": False, "error": "unexpected_error", "message": str(outcome)}}
+        collected[platform] = outcome
+
+    succeeded = {p: item for p, item in collected.items() if item["result"].get("success", False)}
+    if args.assets and succeeded:
+        asset_cache = AssetCache(args.cache_dir, args.asset_base_url)
+        await asyncio.get_running_loop().run_in_executor(None, localize_all, succeeded, asset_cache)
+    save_snapshots(succeeded, args.cache_dir)
+    for platform, item in collected.items():
+        progress[platform].finish(result_status(item["result"]))
+
+    results = {platform: item["result"] for platform, item in collected.items()}
+    return {
+        "success": bool(succeeded),
+        "partial": any(result.get("partial") for result in results.values()),
+        "platforms": results,
+        "library": merge_library(results),
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='多平台统一采集')
+    parser.add_argument('--gog-tokens', help='GOG令牌文件路径')
+    parser.add_argument('--xbox-tokens', help='Xbox令牌文件路径')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='共享缓存目录(默认: Backend/Cache)')
+    parser.add_argument('--no-cache', action='store_true', help='不使用本地共享缓存')
+    parser.add_argument('--deadline', type=float, help='运行时长上限(秒),各平台临近时输出部分结果')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'共享线程池大小(默认{DEFAULT_WORKERS})')
+    parser.add_argument('--assets', action='store_true', help='下载头像和游戏图片到本地缓存并改写为本地地址')
+    parser.add_argument('--asset-base-url', default=DEFAULT_BASE_URL, help='本地图片的访问路径前缀(默认: /assets)')
+    parser.add_argument('--progress', action='store_true', help='以 "PROGRESS: {json}" 行向stderr输出进度事件')
+    parser.add_argument('--progress-file', help='把各平台最新的进度事件原子写入该文件,供后端轮询')
+    parser.add_argument('--resume', action='store_true', help='从各平台的断点日志恢复,只重试失败和未获取的项目')
+    parser.add_argument('--output', '-o', help='输出文件路径(原子写入,stdout只输出一行状态;不指定则输出到stdout)')
+
+    args = parser.parse_args()
+    if not args.gog_tokens and not args.xbox_tokens:
+        parser.error("至少需要指定 --gog-tokens 或 --xbox-tokens")
+
+    try:
+        result = asyncio.run(collect_all(args))
+    except Exception as e:
+        print_error(f"数据获取失败: {e}")
+        result = {
+            "success": False,
+            "error": "unexpected_error",
+            "message": f"数据获取失败: {str(e)}"
+        }
+
+    write_result(result, args.output)
+    sys.exit(0 if result.get("success", False) else 1)
+
+
+if __name__ == "__main__":
+    main()
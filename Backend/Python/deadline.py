@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集截止时间
+采集脚本自行控制运行时长: 临近截止时不再开始新的工作,等待已发出的请求完成后输出部分结果
+"""
+
+import time
+from typing import Optional
+
+# 截止前预留给输出结果的时间(秒)
+DEFAULT_RESERVE = 5.0
+
+
+class Deadline:
+    """
+    截止时间
+
+    根据已完成工作的平均耗时判断剩余时间是否足够开始下一项工作
+    """
+
+    def __init__(self, seconds: Optional[float], reserve: float = DEFAULT_RESERVE):
+        self.start = time.monotonic()
+        self.end = self.start + seconds if seconds else None
+        self.reserve = reserve
+        self.average = 0.0
+        self.count = 0
+
+    def remaining(self) -> float:
+        """剩余秒数,未设置截止时间时为无穷大"""
+        if self.end is None:
+            return float("inf")
+        return self.end - time.monotonic()
+
+    def expired(self) -> bool:
+        """是否已进入预留时间"""
+        return self.remaining() <= self.reserve
+
+    def record(self, duration: float):
+        """记录一项工作的耗时"""
+        self.count += 1
+        self.average += (duration - self.average) / self.count
+
+    def can_start(self) -> bool:
+        """剩余时间是否足够完成一项平均耗时的工作"""
+        return self.remaining() > self.reserve + self.average
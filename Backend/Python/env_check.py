@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Python环境自检
+检查解释器版本和依赖并把结果连同环境指纹(解释器路径、版本、site-packages修改时间)
+写入缓存文件;环境未变化时直接返回缓存结果,后端也可以只比较指纹而不启动Python
+"""
+
+import os
+import sys
+import json
+import site
+import argparse
+import tempfile
+import importlib.util
+import importlib.metadata
+from typing import Dict, Any, List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 默认缓存目录: Backend/Cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "Cache")
+
+# 各平台脚本需要的依赖: (导入名, 发行包名)
+PROFILES = {
+    "gog": [("requests", "requests")],
+    "xbox": [
+        ("xbox.webapi", "xbox-webapi"),
+        ("httpx", "httpx"),
+        ("pydantic", "pydantic"),
+        ("ecdsa", "ecdsa"),
+        ("appdirs", "appdirs"),
+        ("ms_cv", "ms-cv"),
+    ],
+}
+
+# 最低Python版本
+MIN_VERSION = (3, 8)
+
+
+def print_info(message):
+    """打印信息"""
+    print(f"INFO: {message}", file=sys.stderr, flush=True)
+
+
+def fingerprint_paths() -> List[str]:
+    """影响检查结果的路径: 解释器、site-packages目录和依赖列表"""
+    # 解释器可能是符号链接(如 /usr/bin/python3),记录实际文件
+    paths = [os.path.realpath(sys.executable), os.path.join(SCRIPT_DIR, "requirements.txt")]
+    try:
+        paths.extend(site.getsitepackages())
+    except AttributeError:
+        pass
+    paths.append(site.getusersitepackages())
+    return [p for p in dict.fromkeys(paths) if p and os.path.exists(p)]
+
+
+def fingerprint(command: str) -> Dict[str, Any]:
+    """当前环境指纹,只需要stat调用"""
+    return {
+        "command": command,
+        "executable": sys.executable,
+        "version": sys.version.split()[0],
+        "paths": {path: os.stat(path).st_mtime for path in fingerprint_paths()},
+    }
+
+
+def distribution_version(module: str, package: str) -> Optional[str]:
+    """已安装依赖的版本,未安装返回None(不导入模块)"""
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    try:
+        return "unknown" if importlib.util.find_spec(module) else None
+    except (ImportError, ValueError):
+        return None
+
+
+def probe(profile: str) -> Dict[str, Any]:
+    """完整检查解释器版本和依赖"""
+    dependencies = {package: distribution_version(module, package) for module, package in PROFILES[profile]}
+    missing = [package for package, version in dependencies.items() if version is None]
+    version_ok = sys.version_info[:2] >= MIN_VERSION
+
+    messages = []
+    if not version_ok:
+        messages.append(f"Python版本不满足要求,需要 >= {'.'.join(map(str, MIN_VERSION))}")
+    if missing:
+        messages.append(f"缺少依赖: {', '.join(missing)}。请执行: pip install -r Backend/Python/requirements.txt")
+
+    return {
+        "success": version_ok and not missing,
+        "profile": profile,
+        "dependencies": dependencies,
+        "missing": missing,
+        "message": ";".join(messages) or "Python环境正常",
+    }
+
+
+def cache_path(cache_dir: str, profile: str) -> str:
+    return os.path.join(cache_dir, "state", f"python_env_{profile}.json")
+
+
+def load_cached(path: str, current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """指纹一致时返回缓存的检查结果"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("fingerprint") != current:
+        return None
+    return cached
+
+
+def save_cached(path: str, data: Dict[str, Any]):
+    """原子写入检查结果"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def check(profile: str, cache_dir: str, command: str, force: bool = False) -> Dict[str, Any]:
+    """
+    检查环境,指纹未变化时直接返回缓存结果
+
+    Args:
+        profile: 依赖配置(gog / xbox)
+        cache_dir: 缓存目录
+        command: 后端配置的Python命令(PythonPath),写入指纹供后端比较
+        force: 忽略缓存重新检查
+
+    Returns:
+        检查结果,包含 success、dependencies、missing、message、fingerprint、cached
+    """
+    path = cache_path(cache_dir, profile)
+    current = fingerprint(command)
+    cached = None if force else load_cached(path, current)
+    if cached:
+        cached["cached"] = True
+        return cached
+
+    result = probe(profile)
+    result["fingerprint"] = current
+    # 只缓存成功的结果,环境修复后无需等待指纹变化
+    if result["success"]:
+        save_cached(path, result)
+    result["cached"] = False
+    return result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='Python环境自检')
+    parser.add_argument('--profile', choices=sorted(PROFILES), required=True, help='依赖配置')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='缓存目录(默认: Backend/Cache)')
+    parser.add_argument('--command', default=sys.executable, help='后端配置的Python命令,用于后端比较指纹')
+    parser.add_argument('--force', action='store_true', help='忽略缓存重新检查')
+
+    args = parser.parse_args()
+
+    result = check(args.profile, args.cache_dir, args.command, args.force)
+    if result["cached"]:
+        print_info("环境未变化,使用缓存的检查结果")
+    print(json.dumps(result, ensure_ascii=False))
+    sys.exit(0 if result["success"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,24 @@ GOG数据获取脚本
 
 import sys
 import json
+import time
 import argparse
 import requests
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
+
+from achievement_cache import AchievementCache, DEFAULT_CACHE_DIR
+from asset_cache import AssetCache, DEFAULT_BASE_URL
+from catalog_cache import CatalogCache
+from checkpoint_journal import CheckpointJournal, journal_path
+from deadline import Deadline
+from http_retry import RetryPolicy, Hedger, send_with_retry
+from http_validators import ValidatorStore, request_url
+from progress_events import ProgressReporter, ProgressSink, result_status
+from request_memo import RequestMemo, request_key
+from result_output import write_result
+from snapshot_diff import SnapshotDiff
+from snapshot_store import SnapshotStore
 
 # GOG API配置
 CLIENT_ID = "46899977096215655"
@@ -17,6 +32,27 @@ CLIENT_SECRET = "9d85c43b1482497dbbce61f6e4aa173a433796eeae2ca8c5f6129f2dc4de46d
 TOKEN_URL = "https://auth.gog.com/token"
 EMBED_HOST = "https://embed.gog.com"
 GAMEPLAY_HOST = "https://gameplay.gog.com"
+API_HOST = "https://api.gog.com"
+
+# 批量商品接口每次请求的游戏数
+PRODUCTS_CHUNK_SIZE = 50
+
+# 成就条目中与用户相关的字段,其余字段作为共享的成就定义缓存
+ACHIEVEMENT_USER_FIELDS = ("date_unlocked",)
+
+# gameDetails中与用户无关的目录字段,可跨用户缓存(cdKey、downloads等用户数据不缓存)
+CATALOG_DETAIL_FIELDS = ("title", "backgroundImage", "textInformation", "releaseTimestamp",
+                         "changelog", "forumLink", "features", "isPreOrder")
+
+# 单次采集内相同请求只访问一次网络,由collect按用户创建(请求键不含令牌,不能跨用户共享)
+_request_memo: Optional[RequestMemo] = None
+
+# 跨运行保存的 ETag / Last-Modified,由collect按用户设置
+_validators: Optional[ValidatorStore] = None
+
+# 所有请求共用的重试策略和(可选的)对冲请求
+_retry_policy = RetryPolicy()
+_hedger: Optional[Hedger] = None
 
 
 def print_info(message):
@@ -91,7 +127,9 @@ def refresh_access_token(refresh_token: str) -> Optional[Dict[str, Any]]:
     }
     
     try:
-        response = requests.get(TOKEN_URL, params=params, timeout=30)
+        response = send_with_retry(
+            lambda: requests.get(TOKEN_URL, params=params, timeout=30), _retry_policy
+        )
         response.raise_for_status()
         
         token_data = response.json()
@@ -108,7 +146,7 @@ def refresh_access_token(refresh_token: str) -> Optional[Dict[str, Any]]:
 
 
 def make_request(endpoint: str, access_token: str, host: str = EMBED_HOST, 
-                 params: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
+                 params: Optional[Dict] = None, conditional: bool = False) -> Optional[Dict[str, Any]]:
     """
     发送HTTP请求到GOG API
     
@@ -117,18 +155,49 @@ def make_request(endpoint: str, access_token: str, host: str = EMBED_HOST,
         access_token: 访问令牌
         host: API主机地址
         params: 查询参数
+        conditional: 是否使用保存的 ETag / Last-Modified 发送条件请求;
+                     只用于经常重复请求且多数时候不变的用户数据(游戏列表、成就、游玩记录),
+                     目录数据已有目录缓存,保存其响应只会增加校验器存储
         
     Returns:
         响应JSON数据,失败返回None
     """
+    memo = _request_memo
+    if memo is None:
+        return _send_request(endpoint, access_token, host, params, conditional)
+    return memo.call(
+        request_key(host, endpoint, params),
+        lambda: _send_request(endpoint, access_token, host, params, conditional)
+    )
+
+
+def _send_request(endpoint: str, access_token: str, host: str,
+                  params: Optional[Dict], conditional: bool = False) -> Optional[Dict[str, Any]]:
+    """实际发送请求,由make_request去重后调用"""
     url = f"{host}{endpoint}"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     }
+    validators = _validators if conditional else None
+    cache_url = request_url(host, endpoint, params)
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
+        # 条件请求: 内容未变化时服务器只返回304
+        conditional = validators.headers(cache_url) if validators else {}
+        response = send_with_retry(
+            lambda: requests.get(url, headers={**headers, **conditional}, params=params, timeout=30),
+            _retry_policy, hedger=_hedger, hedge_key=host
+        )
+        if response.status_code == 304:
+            body = validators.body(cache_url) if validators else None
+            if body is not None:
+                return body
+            # 保存的内容已被淘汰,重新完整请求
+            response = send_with_retry(
+                lambda: requests.get(url, headers=headers, params=params, timeout=30),
+                _retry_policy, hedger=_hedger, hedge_key=host
+            )
         
         # 404表示数据不存在(例如游戏没有游玩记录),这是正常情况
         if response.status_code == 404:
@@ -140,13 +209,29 @@ def make_request(endpoint: str, access_token: str, host: str = EMBED_HOST,
         if not response.content:
             return {}
         
-        return response.json()
+        data = response.json()
+        if validators:
+            validators.put(cache_url, response.headers, data)
+        return data
         
     except requests.exceptions.RequestException as e:
         print_error(f"请求 {endpoint} 失败: {e}")
         return None
 
 
+def configure_retry(retries: int, hedge: bool = False):
+    """
+    设置请求重试策略
+    
+    Args:
+        retries: 每个请求最多重试次数
+        hedge: 是否在请求超过近期p95延迟时发出对冲请求
+    """
+    global _retry_policy, _hedger
+    _retry_policy = RetryPolicy(retries)
+    _hedger = Hedger() if hedge else None
+
+
 def get_user_data(access_token: str) -> Optional[Dict[str, Any]]:
     """获取用户基本信息"""
     print_info("获取用户数据...")
@@ -156,7 +241,45 @@ def get_user_data(access_token: str) -> Optional[Dict[str, Any]]:
 def get_owned_products(access_token: str) -> Optional[Dict[str, Any]]:
     """获取用户拥有的游戏列表"""
     print_info("获取游戏列表...")
-    return make_request("/user/data/games", access_token)
+    return make_request("/user/data/games", access_token, conditional=True)
+
+
+def get_filtered_products(access_token: str, workers: int = 8) -> Optional[List[Dict[str, Any]]]:
+    """
+    通过分页的游戏库列表接口获取游戏摘要(标题、封面等)
+    
+    第1页返回总页数,其余页并发获取
+    
+    Args:
+        access_token: 访问令牌
+        workers: 并发请求数
+        
+    Returns:
+        游戏摘要列表(按页顺序),任意一页请求失败返回None(调用方改用 /user/data/games,
+        避免缺页的游戏库被当作完整结果,在快照和 --diff 中显示为已删除)
+    """
+    def fetch_page(page: int) -> Optional[Dict[str, Any]]:
+        return make_request("/account/getFilteredProducts", access_token,
+                            params={"mediaType": 1, "page": page}, conditional=True)
+    
+    print_info("获取游戏库列表...")
+    first = fetch_page(1)
+    if not first or "products" not in first:
+        return None
+    
+    pages = [first]
+    total_pages = int(first.get("totalPages") or 1)
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pages.extend(pool.map(fetch_page, range(2, total_pages + 1)))
+    
+    products = []
+    for page, response in enumerate(pages, 1):
+        if not response or "products" not in response:
+            print_error(f"游戏库列表第 {page} 页获取失败,改用完整游戏ID列表")
+            return None
+        products.extend(response["products"])
+    return products
 
 
 def get_game_details(access_token: str, game_id: str) -> Optional[Dict[str, Any]]:
@@ -164,16 +287,131 @@ def get_game_details(access_token: str, game_id: str) -> Optional[Dict[str, Any]
     return make_request(f"/account/gameDetails/{game_id}.json", access_token)
 
 
-def get_achievements(access_token: str, product_id: str, user_id: str) -> Optional[Dict[str, Any]]:
-    """获取游戏成就信息"""
+def product_to_details(product: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    将商品接口的条目转换为与gameDetails相同字段名的目录数据
+    
+    Args:
+        product: /products 接口返回的单个商品
+        
+    Returns:
+        目录字段字典(CATALOG_DETAIL_FIELDS的子集)
+    """
+    from datetime import datetime
+    images = product.get("images") or {}
+    details = {
+        "title": product.get("title"),
+        "backgroundImage": images.get("background"),
+        "textInformation": (product.get("description") or {}).get("lead"),
+        "forumLink": (product.get("links") or {}).get("forum"),
+        "isPreOrder": product.get("is_pre_order"),
+    }
+    if product.get("release_date"):
+        try:
+            released = datetime.strptime(product["release_date"], "%Y-%m-%dT%H:%M:%S%z")
+            details["releaseTimestamp"] = int(released.timestamp())
+        except ValueError:
+            pass
+    return {k: v for k, v in details.items() if v is not None}
+
+
+def get_products(access_token: str, game_ids: List[str],
+                 chunk_size: int = PRODUCTS_CHUNK_SIZE) -> Dict[str, Dict[str, Any]]:
+    """
+    通过批量商品接口获取多个游戏的目录数据
+    
+    Args:
+        access_token: 访问令牌
+        game_ids: 游戏ID列表
+        chunk_size: 每次请求的游戏数
+        
+    Returns:
+        {game_id: 目录数据},接口未返回的游戏不包含在内
+    """
+    products = {}
+    for start in range(0, len(game_ids), chunk_size):
+        chunk = [str(game_id) for game_id in game_ids[start:start + chunk_size]]
+        response = make_request("/products", access_token, host=API_HOST,
+                                params={"ids": ",".join(chunk), "expand": "description"})
+        if not isinstance(response, list):
+            continue
+        for product in response:
+            details = product_to_details(product)
+            if product.get("id") is not None and details.get("title"):
+                products[str(product["id"])] = details
+    return products
+
+
+def split_achievements(response: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    将成就接口响应拆分为共享的成就定义和用户解锁数据
+    
+    Args:
+        response: 成就接口响应
+        
+    Returns:
+        (成就定义, {achievement_id: date_unlocked})
+    """
+    items = response.get("items") or []
+    definitions = {
+        "total_count": response.get("total_count", len(items)),
+        "achievements_mode": response.get("achievements_mode"),
+        "items": [
+            {k: v for k, v in item.items() if k not in ACHIEVEMENT_USER_FIELDS}
+            for item in items
+        ]
+    }
+    unlocks = {
+        str(item.get("achievement_id")): item["date_unlocked"]
+        for item in items
+        if item.get("date_unlocked")
+    }
+    return definitions, unlocks
+
+
+def merge_achievements(definitions: Dict[str, Any], unlocks: Dict[str, Any]) -> Dict[str, Any]:
+    """将成就定义与用户解锁数据合并为成就接口的响应格式"""
+    return {
+        "total_count": definitions.get("total_count", 0),
+        "achievements_mode": definitions.get("achievements_mode"),
+        "items": [
+            dict(item, date_unlocked=unlocks.get(str(item.get("achievement_id"))))
+            for item in definitions.get("items", [])
+        ]
+    }
+
+
+def get_achievements(access_token: str, product_id: str, user_id: str,
+                     cache: Optional[AchievementCache] = None) -> Optional[Dict[str, Any]]:
+    """
+    获取游戏成就信息
+    
+    成就定义按产品缓存在所有用户共享的本地目录中,用户解锁数据单独保存。
+    共享缓存表明产品没有成就时不再请求接口。
+    只缓存200响应的成就定义: 404可能只表示该用户没有游玩记录,不能推广到其他用户。
+    """
+    if cache:
+        definitions = cache.get_definitions("gog", product_id)
+        # 来自200响应的定义总是带有 achievements_mode,旧版本由404写入的空定义不再使用
+        if definitions is not None and "achievements_mode" in definitions and not definitions.get("items"):
+            cache.set_unlocks("gog", user_id, product_id, {})
+            return merge_achievements(definitions, {})
+    
     url = f"/clients/{product_id}/users/{user_id}/achievements"
-    return make_request(url, access_token, host=GAMEPLAY_HOST)
+    response = make_request(url, access_token, host=GAMEPLAY_HOST, conditional=True)
+    
+    if cache and response is not None and response.get("error") != "not_found":
+        definitions, unlocks = split_achievements(response)
+        cache.put_definitions("gog", product_id, definitions)
+        cache.set_unlocks("gog", user_id, product_id, unlocks)
+    
+    return response
 
 
 def get_game_sessions(access_token: str, product_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     """获取游戏会话记录(游玩时长)"""
     url = f"/clients/{product_id}/users/{user_id}/sessions"
-    result = make_request(url, access_token, host=GAMEPLAY_HOST)
+    result = make_request(url, access_token, host=GAMEPLAY_HOST, conditional=True)
     
     # 404表示没有游玩记录,这是正常情况
     if result and result.get("error") == "not_found":
@@ -213,12 +451,91 @@ def calculate_total_play_time(sessions: List[Dict]) -> int:
     return total_minutes
 
 
-def get_all_data(tokens_path: str) -> Dict[str, Any]:
+def catalog_fields(game_details: Dict[str, Any]) -> Dict[str, Any]:
+    """提取gameDetails中可跨用户共享的目录字段"""
+    return {k: game_details[k] for k in CATALOG_DETAIL_FIELDS if k in game_details}
+
+
+def last_session_end(game: Dict[str, Any]) -> float:
+    """
+    游戏最近一次会话的结束时间
+    
+    Args:
+        game: 快照中的游戏记录
+        
+    Returns:
+        时间戳,没有游玩记录时返回0
+    """
+    from datetime import datetime
+    latest = 0.0
+    for session in ((game.get("sessions") or {}).get("sessions") or []):
+        value = session.get("dateFinished") or session.get("dateStarted")
+        if not value:
+            continue
+        try:
+            latest = max(latest, datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+        except (ValueError, AttributeError):
+            continue
+    return latest
+
+
+def load_recency(store: SnapshotStore) -> Dict[str, float]:
+    """
+    从上一个快照读取每个游戏的最近游玩时间
+    
+    Args:
+        store: 用户快照存储
+        
+    Returns:
+        {game_id: 最近会话结束时间戳},没有快照时为空
+    """
+    snapshot = store.open()
+    if not snapshot:
+        return {}
+    with snapshot:
+        return {str(game.get("gameId")): last_session_end(game) for game in snapshot.records()}
+
+
+def prioritize_games(game_ids: List[Any], recency: Dict[str, float]) -> List[Any]:
+    """
+    按最近游玩时间倒序排列游戏,使截止时间内优先获取最近玩过的游戏
+    
+    上一个快照中没有的游戏(新加入游戏库)排在最前,从未游玩的排在最后,
+    时间相同的保持API原有顺序
+    
+    Args:
+        game_ids: 游戏ID列表
+        recency: load_recency的结果
+        
+    Returns:
+        排序后的游戏ID列表
+    """
+    if not recency:
+        return list(game_ids)
+    return sorted(game_ids, key=lambda game_id: recency.get(str(game_id), float("inf")), reverse=True)
+
+
+def get_all_data(tokens_path: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 deadline: Optional[Deadline] = None,
+                 recency: Optional[Dict[str, float]] = None,
+                 user_details: bool = False,
+                 products_chunk_size: int = PRODUCTS_CHUNK_SIZE,
+                 listing: str = "games",
+                 progress: Optional[ProgressReporter] = None,
+                 journal: Optional[CheckpointJournal] = None) -> Dict[str, Any]:
     """
     获取所有GOG数据
     
     Args:
         tokens_path: 令牌文件路径
+        cache_dir: 共享缓存目录,为None时不使用缓存
+        deadline: 截止时间,临近时停止获取剩余游戏并返回部分结果
+        recency: 每个游戏的最近游玩时间,用于决定获取顺序
+        user_details: 是否为每个游戏请求gameDetails(下载、CD Key等用户数据)
+        products_chunk_size: 批量商品接口每次请求的游戏数
+        listing: 游戏列表来源,"games"为 /user/data/games(只有ID),"filtered"为分页的游戏摘要列表
+        progress: 进度报告,为None时不输出进度
+        journal: 断点日志,逐个游戏记录结果;其中已完成的游戏不再请求
         
     Returns:
         包含所有数据的字典
@@ -281,8 +598,27 @@ def get_all_data(tokens_path: str) -> Dict[str, Any]:
     if not user_id:
         user_id = user_data.get("galaxyUserId") or user_data.get("userId")
     
+    progress = progress or ProgressReporter("gog")
+    
     # 获取游戏列表
-    owned_games = get_owned_products(access_token)
+    progress.phase("listing")
+    summaries = {}
+    owned_games = None
+    if listing == "filtered":
+        products = get_filtered_products(access_token)
+        if products is not None:
+            summaries = {str(product["id"]): product for product in products if "id" in product}
+            owned_games = {"owned": [product["id"] for product in products if "id" in product]}
+    if owned_games is None:
+        owned_games = get_owned_products(access_token)
+    
+    # 游戏列表获取失败时整体失败,不保存空的游戏库覆盖上一个快照
+    if not has_owned_list({"ownedGames": owned_games}):
+        return {
+            "success": False,
+            "error": "api_error",
+            "message": "无法获取游戏列表"
+        }
     
     result = {
         "success": True,
@@ -292,13 +628,49 @@ def get_all_data(tokens_path: str) -> Dict[str, Any]:
         "games": []
     }
     
+    achievement_cache = AchievementCache(cache_dir) if cache_dir else None
+    catalog = CatalogCache(cache_dir) if cache_dir else None
+    
     # 获取每个游戏的详细信息、成就和游玩时长
     if owned_games and "owned" in owned_games:
-        game_ids = owned_games["owned"]
+        # 游戏ID可能因DLC或捆绑包关系重复出现
+        game_ids = prioritize_games(list(dict.fromkeys(owned_games["owned"])), recency or {})
         print_info(f"找到 {len(game_ids)} 个游戏")
         
+        # 批量查询目录缓存,命中的游戏不再请求目录数据
+        cached_details = catalog.get_many("gog", game_ids) if catalog else {}
+        if catalog:
+            print_info(f"目录缓存命中 {len(cached_details)}/{len(game_ids)} 个游戏")
+        
+        # 未命中的游戏通过批量商品接口获取目录数据
+        missing = [game_id for game_id in game_ids if str(game_id) not in cached_details]
+        progress.phase("catalog", len(missing))
+        new_details = get_products(access_token, missing, products_chunk_size) if missing else {}
+        if missing:
+            print_info(f"批量获取目录数据: {len(new_details)}/{len(missing)} 个游戏")
+        cached_details.update(new_details)
+        progress.advance(len(missing))
+        
+        progress.phase("games", len(game_ids))
+        
+        # 断点日志中已完成的游戏直接使用记录的结果
+        resumed = journal.completed("game") if journal else {}
+        if resumed:
+            result["games"].extend(resumed[str(game_id)] for game_id in game_ids if str(game_id) in resumed)
+            progress.advance(len(result["games"]), measured=False)
+            print_info(f"从断点日志恢复 {len(result['games'])} 个游戏")
+            game_ids = [game_id for game_id in game_ids if str(game_id) not in resumed]
+        
         for i, game_id in enumerate(game_ids, 1):
+            if deadline and not deadline.can_start():
+                result["partial"] = True
+                result["pendingGames"] = [str(pending) for pending in game_ids[i - 1:]]
+                print_info(f"接近截止时间,剩余 {len(result['pendingGames'])} 个游戏未获取")
+                break
+            
             print_info(f"获取游戏 {i}/{len(game_ids)}: {game_id}")
+            started = time.monotonic()
+            errors = []
             
             game_info = {
                 "gameId": str(game_id),
@@ -306,43 +678,272 @@ def get_all_data(tokens_path: str) -> Dict[str, Any]:
                 "achievements": None,
                 "playTimeMinutes": 0
             }
+            if str(game_id) in summaries:
+                game_info["summary"] = summaries[str(game_id)]
             
-            # 获取游戏详情
-            game_details = get_game_details(access_token, str(game_id))
-            if game_details:
-                game_info["details"] = game_details
-            
-            # 获取成就
-            achievements = get_achievements(access_token, str(game_id), str(user_id))
-            if achievements:
-                game_info["achievements"] = achievements
+            try:
+                # 获取游戏详情: 目录数据来自缓存或批量接口,只有需要用户数据或批量接口未返回时才请求gameDetails
+                if str(game_id) in cached_details and not user_details:
+                    game_info["details"] = cached_details[str(game_id)]
+                elif str(game_id) in summaries and not user_details:
+                    # 列表摘要中已有标题,不再逐个请求gameDetails
+                    game_info["details"] = {"title": summaries[str(game_id)].get("title")}
+                else:
+                    game_details = get_game_details(access_token, str(game_id))
+                    if game_details:
+                        game_info["details"] = game_details
+                        if game_details.get("title"):
+                            new_details[str(game_id)] = catalog_fields(game_details)
+                    else:
+                        game_info["details"] = cached_details.get(str(game_id))
+                        errors.append("details")
+                
+                # 获取成就
+                achievements = get_achievements(access_token, str(game_id), str(user_id), achievement_cache)
+                if achievements:
+                    game_info["achievements"] = achievements
+                elif achievements is None:
+                    errors.append("achievements")
+                
+                # 获取游玩时长
+                sessions = get_game_sessions(access_token, str(game_id), str(user_id))
+                if sessions and "sessions" in sessions and sessions["sessions"]:
+                    play_time = calculate_total_play_time(sessions["sessions"])
+                    game_info["playTimeMinutes"] = play_time
+                    game_info["sessions"] = sessions
+                elif sessions is None:
+                    errors.append("sessions")
+            except Exception as e:
+                print_error(f"获取游戏 {game_id} 失败: {e}")
+                errors.append(str(e))
             
-            # 获取游玩时长
-            sessions = get_game_sessions(access_token, str(game_id), str(user_id))
-            if sessions and "sessions" in sessions and sessions["sessions"]:
-                play_time = calculate_total_play_time(sessions["sessions"])
-                game_info["playTimeMinutes"] = play_time
-                game_info["sessions"] = sessions
+            if journal and errors:
+                journal.fail(game_id, "game", errors)
+            elif journal:
+                journal.record(game_id, "game", game_info)
             
             result["games"].append(game_info)
+            if deadline:
+                deadline.record(time.monotonic() - started)
+            progress.advance()
+        
+        if catalog:
+            catalog.put_many("gog", new_details)
+    
+    if catalog:
+        catalog.close()
+    if achievement_cache:
+        achievement_cache.save_unlocks("gog", str(user_id))
+    if journal:
+        failed = journal.failed("game")
+        if failed:
+            result["failedGames"] = sorted(failed)
+            print_info(f"{len(failed)} 个游戏获取失败,使用 --resume 重新运行时只重试这些游戏和未获取的游戏")
+        journal.close(complete=not result.get("partial"))
     
+    if _request_memo and _request_memo.hits:
+        print_info(f"重复请求已合并: {_request_memo.hits} 次")
     print_info(f"数据获取完成: {len(result['games'])} 个游戏")
     return result
 
 
+def localize_images(result: Dict[str, Any], asset_cache: AssetCache):
+    """
+    将结果中的头像和游戏图片下载到本地缓存,并改写为本地地址
+    
+    Args:
+        result: get_all_data的结果
+        asset_cache: 图片缓存
+    """
+    targets = []
+    user_data = result.get("userData") or {}
+    if isinstance(user_data.get("avatar"), str):
+        targets.append((user_data, "avatar"))
+    for game in result.get("games", []):
+        details = game.get("details") or {}
+        if isinstance(details.get("backgroundImage"), str):
+            targets.append((details, "backgroundImage"))
+    
+    assets = asset_cache.localize(container[key] for container, key in targets)
+    for container, key in targets:
+        if container[key] in assets:
+            container[key] = assets[container[key]]["url"]
+    result["assets"] = assets
+
+
+def collect(tokens_path: str, cache_dir: str, use_cache: bool = True,
+            deadline: Optional[Deadline] = None, resume: bool = False,
+            journal_file: Optional[str] = None, **options) -> Dict[str, Any]:
+    """
+    完整采集一次: 按上一个快照中的游玩时间决定获取顺序后获取所有数据
+    
+    Args:
+        tokens_path: 令牌文件路径
+        cache_dir: 共享缓存目录(快照和断点日志始终保存在该目录)
+        use_cache: 是否使用目录和成就缓存
+        deadline: 截止时间
+        resume: 是否从断点日志恢复已完成的游戏
+        journal_file: 断点日志路径,默认为 state/journal/gog_{user_id}.ndjson
+        options: 传给get_all_data的其他参数
+        
+    Returns:
+        get_all_data的结果
+    """
+    global _validators, _request_memo
+    
+    token_data = load_tokens(tokens_path)
+    recency = {}
+    journal = None
+    validators = None
+    if token_data and token_data.get("user_id"):
+        user_id = str(token_data["user_id"])
+        recency = load_recency(SnapshotStore(cache_dir, "gog", user_id))
+        journal = CheckpointJournal(journal_file or journal_path(cache_dir, "gog", user_id), resume)
+        if use_cache:
+            validators = ValidatorStore(cache_dir, user_id)
+    elif journal_file:
+        journal = CheckpointJournal(journal_file, resume)
+    
+    _validators = validators
+    _request_memo = RequestMemo()
+    _retry_policy.deadline = deadline
+    try:
+        return get_all_data(tokens_path, cache_dir if use_cache else None, deadline, recency,
+                            journal=journal, **options)
+    finally:
+        _validators = None
+        _request_memo = None
+        if validators:
+            if validators.revalidated:
+                print_info(f"条件请求未变化(304): {validators.revalidated} 次")
+            validators.close()
+        if _retry_policy.retried:
+            print_info(f"请求重试: {_retry_policy.retried} 次")
+        if _hedger:
+            if _hedger.hedged:
+                print_info(f"对冲请求: {_hedger.hedged} 次")
+            _hedger.close()
+
+
+def has_owned_list(result: Dict[str, Any]) -> bool:
+    """结果中是否有成功获取的完整游戏列表"""
+    owned_games = result.get("ownedGames")
+    return isinstance(owned_games, dict) and isinstance(owned_games.get("owned"), list)
+
+
+def save_snapshot(cache_dir: str, result: Dict[str, Any]):
+    """保存快照供后续读取,未获取的游戏沿用上一个快照中的记录"""
+    if result.get("success", False) and result.get("userId"):
+        meta = {k: v for k, v in result.items() if k != "games"}
+        SnapshotStore(cache_dir, "gog", str(result["userId"])).save(
+            meta, result["games"], "gameId", keep_previous=result.get("pendingGames")
+        )
+
+
+def read_snapshot(store: SnapshotStore, max_age: float, game_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    从本地快照读取数据,不访问网络
+    
+    Args:
+        store: 用户快照存储
+        max_age: 最大允许的快照时长(秒)
+        game_id: 只读取指定游戏,为None时读取全部游戏
+        
+    Returns:
+        与完整采集相同格式的结果,快照不存在或已过期返回None
+    """
+    snapshot = store.open(max_age)
+    if not snapshot:
+        return None
+    
+    with snapshot:
+        result = dict(snapshot.meta)
+        if game_id is not None:
+            game = snapshot.get(game_id)
+            result["games"] = [game] if game else []
+        else:
+            result["games"] = list(snapshot.records())
+        result["fromSnapshot"] = True
+        result["snapshotAge"] = int(snapshot.age())
+    
+    print_info(f"使用本地快照(已保存 {result['snapshotAge']} 秒)")
+    return result
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='GOG数据获取脚本')
     parser.add_argument('--tokens', required=True, help='令牌文件路径')
+    parser.add_argument('--output', '-o', help='输出文件路径(原子写入,stdout只输出一行状态;不指定则输出到stdout)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='共享缓存目录(默认: Backend/Cache)')
+    parser.add_argument('--no-cache', action='store_true', help='不使用本地共享缓存')
+    parser.add_argument('--diff', action='store_true', help='只输出与上次运行相比新增、删除和变更的游戏')
+    parser.add_argument('--max-age', type=float, help='读取模式: 本地快照未超过指定秒数时直接返回快照数据')
+    parser.add_argument('--game-id', help='只返回指定游戏的数据')
+    parser.add_argument('--assets', action='store_true', help='下载头像和游戏图片到本地缓存并改写为本地地址')
+    parser.add_argument('--asset-base-url', default=DEFAULT_BASE_URL, help='本地图片的访问路径前缀(默认: /assets)')
+    parser.add_argument('--user-details', action='store_true', help='为每个游戏请求gameDetails(下载、CD Key等用户数据)')
+    parser.add_argument('--products-chunk-size', type=int, default=PRODUCTS_CHUNK_SIZE,
+                        help=f'批量商品接口每次请求的游戏数(默认{PRODUCTS_CHUNK_SIZE})')
+    parser.add_argument('--listing', choices=['games', 'filtered'], default='games',
+                        help='游戏列表来源: games(只有ID) 或 filtered(分页的游戏摘要,并发获取)')
+    parser.add_argument('--deadline', type=float, help='运行时长上限(秒),临近时输出部分结果并列出未获取的游戏')
+    parser.add_argument('--progress', action='store_true', help='以 "PROGRESS: {json}" 行向stderr输出进度事件')
+    parser.add_argument('--progress-file', help='把最新的进度事件原子写入该文件,供后端轮询')
+    parser.add_argument('--retries', type=int, default=3, help='每个请求失败后最多重试次数(默认3,指数退避并遵守Retry-After)')
+    parser.add_argument('--hedge', action='store_true', help='请求超过近期p95延迟时再发一个相同请求,使用先返回的结果')
+    parser.add_argument('--resume', action='store_true', help='从断点日志恢复: 跳过上次已完成的游戏,只重试失败和未获取的游戏')
+    parser.add_argument('--journal', help='断点日志路径(默认: Cache/state/journal/gog_{user_id}.ndjson)')
     
     args = parser.parse_args()
+    if args.diff and args.game_id is not None:
+        parser.error("--diff 需要完整游戏列表,不能与 --game-id 同时使用")
+    
+    configure_retry(args.retries, args.hedge)
     
     try:
-        # 获取所有数据
-        result = get_all_data(args.tokens)
+        result = None
+        
+        # 读取模式: 快照足够新时不访问网络
+        token_data = load_tokens(args.tokens) if args.max_age is not None else None
+        if token_data and token_data.get("user_id"):
+            store = SnapshotStore(args.cache_dir, "gog", str(token_data["user_id"]))
+            result = read_snapshot(store, args.max_age, args.game_id)
+        
+        if result is None:
+            # 获取所有数据
+            deadline = Deadline(args.deadline)
+            progress = ProgressReporter("gog", ProgressSink(args.progress_file, args.progress))
+            result = collect(
+                args.tokens, args.cache_dir, not args.no_cache, deadline,
+                user_details=args.user_details, products_chunk_size=args.products_chunk_size,
+                listing=args.listing, progress=progress, resume=args.resume, journal_file=args.journal
+            )
+            
+            if args.assets and result.get("success", False):
+                if deadline.expired():
+                    print_info("接近截止时间,跳过图片本地化")
+                else:
+                    progress.phase("assets")
+                    localize_images(result, AssetCache(args.cache_dir, args.asset_base_url))
+            
+            save_snapshot(args.cache_dir, result)
+            progress.finish(result_status(result))
+            
+            if args.game_id is not None and "games" in result:
+                result["games"] = [g for g in result["games"] if g["gameId"] == str(args.game_id)]
+        
+        # 变更检测模式: 用差异替换完整游戏列表
+        # 游戏列表获取失败时没有可比较的完整列表,不做差异(否则所有游戏都会显示为已删除)
+        if args.diff and result.get("success", False) and not has_owned_list(result):
+            print_error("游戏列表获取失败,跳过变更检测")
+        elif args.diff and result.get("success", False):
+            differ = SnapshotDiff(args.cache_dir, "gog", str(result["userId"]))
+            result["diff"] = differ.diff(result.pop("games"), "gameId", skip=result.get("pendingGames"))
+            result.pop("ownedGames", None)
         
         # 输出JSON结果
-        print(json.dumps(result, ensure_ascii=False, indent=2))
+        write_result(result, args.output)
         
         # 返回状态码
         if result.get("success", False):
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集脚本统一的HTTP重试策略
+指数退避加随机抖动,429/503时遵守 Retry-After,按请求方法是否幂等限制重试;
+可选的对冲请求: 请求耗时超过同一主机近期p95延迟时再发一个相同请求,使用先返回的结果
+"""
+
+import time
+import queue
+import random
+import asyncio
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# 可重试的HTTP状态码
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# 服务器明确表示请求未被处理的状态码,非幂等请求也可以在等待后重试
+REJECTED_STATUSES = frozenset((429, 503))
+
+# 幂等的请求方法
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After(秒数或HTTP日期),无法解析时返回None"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    重试策略
+
+    第n次重试前等待 [0, min(cap, base * 2^n)] 之间的随机时间(full jitter);
+    响应带有 Retry-After 时至少等待该时长,超过cap或截止时间前剩余时间时不再重试
+    """
+
+    def __init__(self, retries: int = 3, base: float = 0.5, cap: float = 30.0, deadline=None):
+        """
+        Args:
+            retries: 最多重试次数(不含第一次请求)
+            base: 退避基数(秒)
+            cap: 单次等待上限(秒)
+            deadline: 截止时间(deadline.Deadline),剩余时间不足时不再等待重试
+        """
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+        self.deadline = deadline
+        self.retried = 0
+        # 同一策略在多个工作线程中共用
+        self.lock = threading.Lock()
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        第attempt次重试前的等待时间
+
+        Returns:
+            等待秒数,不应再重试时返回None
+        """
+        if attempt >= self.retries:
+            return None
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+        if retry_after is not None:
+            if retry_after > self.cap:
+                return None
+            delay = max(delay, retry_after)
+        if self.deadline is not None and self.deadline.remaining() - self.deadline.reserve <= delay:
+            return None
+        with self.lock:
+            self.retried += 1
+        return delay
+
+    def retryable_status(self, method: str, status: int) -> bool:
+        """该状态码是否可以重试;非幂等请求只在服务器明确拒绝时重试"""
+        if method.upper() in IDEMPOTENT_METHODS:
+            return status in RETRY_STATUSES
+        return status in REJECTED_STATUSES
+
+    @staticmethod
+    def retryable_error(method: str, error: Exception) -> bool:
+        """该网络错误是否可以重试;非幂等请求只在连接未建立时重试"""
+        if method.upper() in IDEMPOTENT_METHODS:
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        return isinstance(error, requests.ConnectTimeout)
+
+
+class Hedger:
+    """
+    对冲请求
+
+    按key(如主机)分别记录近期成功请求的延迟,请求超过该key的p95延迟仍未返回时发出一个相同的请求,
+    使用先完成的结果;样本不足时不对冲。只用于幂等请求。
+    请求在共享的有界守护线程池中执行,线程都在使用时不对冲而直接执行;
+    落后的请求在后台完成后丢弃,不会推迟进程退出
+    """
+
+    def __init__(self, percentile: float = 0.95, min_samples: int = 20, window: int = 200,
+                 max_workers: int = 16):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.max_workers = max_workers
+        self.latencies: Dict[str, deque] = {}
+        self.lock = threading.Lock()
+        self.hedged = 0
+        self.closed = False
+        # 线程池: 空闲线程在队列上等待,按需创建到max_workers个
+        self.tasks: "queue.SimpleQueue[Callable[[], None]]" = queue.SimpleQueue()
+        self.workers = 0
+        self.idle = 0
+
+    def threshold(self, key: str = "") -> Optional[float]:
+        """key当前的对冲阈值(秒)"""
+        with self.lock:
+            samples = self.latencies.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * self.percentile), len(ordered) - 1)]
+
+    def _timed(self, send: Callable[[], Any], key: str) -> Any:
+        started = time.monotonic()
+        result = send()
+        with self.lock:
+            self.latencies.setdefault(key, deque(maxlen=self.window)).append(time.monotonic() - started)
+        return result
+
+    def _worker(self):
+        while True:
+            self.tasks.get()()
+            with self.lock:
+                self.idle += 1
+
+    def _start(self, send: Callable[[], Any], key: str) -> Optional[Future]:
+        """在线程池中执行请求,没有可用线程时返回None"""
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(self._timed(send, key))
+            except BaseException as e:
+                future.set_exception(e)
+
+        with self.lock:
+            if self.idle:
+                self.idle -= 1
+            elif self.workers < self.max_workers:
+                self.workers += 1
+                threading.Thread(target=self._worker, name="hedge", daemon=True).start()
+            else:
+                return None
+            self.tasks.put(run)
+        return future
+
+    def call(self, send: Callable[[], Any], key: str = "") -> Any:
+        """执行请求,超过key的阈值时发出对冲请求;关闭后直接执行"""
+        threshold = None if self.closed else self.threshold(key)
+        if threshold is None:
+            return self._timed(send, key)
+
+        primary = self._start(send, key)
+        if primary is None:
+            return self._timed(send, key)
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+
+        backup = self._start(send, key)
+        if backup is None:
+            return primary.result()
+        with self.lock:
+            self.hedged += 1
+        done, _ = wait([primary, backup], return_when=FIRST_COMPLETED)
+        first = done.pop()
+        try:
+            return first.result()
+        except Exception:
+            # 先完成的请求失败时等待另一个
+            return (backup if first is primary else primary).result()
+
+    def close(self):
+        """采集结束后停止对冲,之后的请求直接执行"""
+        self.closed = True
+
+
+def send_with_retry(send: Callable[[], requests.Response], policy: RetryPolicy,
+                    method: str = "GET", hedger: Optional[Hedger] = None,
+                    hedge_key: str = "") -> requests.Response:
+    """
+    按重试策略发送同步请求
+
+    Args:
+        send: 发出一次请求并返回响应的函数
+        policy: 重试策略
+        method: 请求方法,决定是否幂等
+        hedger: 对冲请求,只对幂等请求生效
+        hedge_key: 对冲阈值的统计分组(如主机),不同接口的延迟互不影响
+
+    Returns:
+        最后一次请求的响应(可重试的状态码在重试用尽后原样返回,由调用方处理)
+
+    Raises:
+        requests.RequestException: 不可重试或重试用尽的网络错误
+    """
+    if hedger is not None and method.upper() in IDEMPOTENT_METHODS:
+        send = (lambda raw: lambda: hedger.call(raw, hedge_key))(send)
+
+    attempt = 0
+    while True:
+        try:
+            response = send()
+        except requests.RequestException as e:
+            delay = policy.delay(attempt) if policy.retryable_error(method, e) else None
+            if delay is None:
+                raise
+        else:
+            if not policy.retryable_status(method, response.status_code):
+                return response
+            delay = policy.delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+            if delay is None:
+                return response
+        time.sleep(delay)
+        attempt += 1
+
+
+async def call_with_retry(call: Callable[[], Awaitable[Any]], policy: RetryPolicy, method: str = "GET") -> Any:
+    """
+    按重试策略执行异步请求(xbox-webapi/httpx)
+
+    Args:
+        call: 每次调用返回一个新的协程
+        policy: 重试策略
+        method: 请求方法,决定是否幂等
+
+    Returns:
+        协程的结果
+
+    Raises:
+        不可重试或重试用尽的异常
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            delay = None
+            response = getattr(e, "response", None)
+            if httpx is not None and isinstance(e, httpx.HTTPStatusError) and response is not None:
+                if policy.retryable_status(method, response.status_code):
+                    delay = policy.delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+            elif httpx is not None and isinstance(e, httpx.TransportError):
+                if method.upper() in IDEMPOTENT_METHODS or isinstance(e, httpx.ConnectError):
+                    delay = policy.delay(attempt)
+            if delay is None:
+                raise
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP条件请求验证器缓存
+按(用户, URL)保存响应的 ETag / Last-Modified 和响应内容,下次请求时发送
+If-None-Match / If-Modified-Since;服务器返回304时直接使用保存的内容,不再下载完整响应
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import urlencode
+from typing import Dict, Any, Optional
+
+# 默认缓存目录: Backend/Cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Cache")
+
+# 最多保留的条目数,超出后淘汰最久未访问的条目
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def request_url(host: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """规范化的请求URL,参数顺序不影响结果"""
+    url = f"{host}{endpoint}"
+    if params:
+        url += "?" + urlencode(sorted(params.items()))
+    return url
+
+
+class ValidatorStore:
+    """
+    基于SQLite的验证器缓存
+
+    响应内容与用户相关(如 /userData.json 对所有用户URL相同),因此按 scope(平台用户ID)区分
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, scope: str = "",
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "http_validators.sqlite3")
+        self.scope = scope
+        self.max_entries = max_entries
+        self.revalidated = 0
+        # 请求可能来自多个线程(分页并发请求)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS validators (
+                scope TEXT NOT NULL,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (scope, url)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_validators_accessed ON validators (accessed_at)")
+        self.conn.commit()
+
+    def headers(self, url: str) -> Dict[str, str]:
+        """
+        条件请求头
+
+        Returns:
+            If-None-Match / If-Modified-Since 请求头,没有保存的验证器时为空字典
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM validators WHERE scope = ? AND url = ?",
+                (self.scope, url)
+            ).fetchone()
+        if not row:
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def body(self, url: str) -> Optional[Any]:
+        """收到304时读取保存的响应内容"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body FROM validators WHERE scope = ? AND url = ?", (self.scope, url)
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute(
+                "UPDATE validators SET accessed_at = ? WHERE scope = ? AND url = ?",
+                (time.time(), self.scope, url)
+            )
+            self.conn.commit()
+            self.revalidated += 1
+        return json.loads(row[0])
+
+    def put(self, url: str, response_headers: Any, body: Any):
+        """
+        保存响应的验证器和内容,响应没有 ETag / Last-Modified 时不保存
+
+        Args:
+            url: request_url生成的URL
+            response_headers: 响应头(不区分大小写的映射)
+            body: 解析后的响应内容
+        """
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO validators (scope, url, etag, last_modified, body, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.scope, url, etag, last_modified, json.dumps(body, ensure_ascii=False), time.time())
+            )
+            self.conn.commit()
+
+    def evict(self):
+        """按容量上限淘汰最久未访问的条目"""
+        with self.lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM validators").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM validators WHERE rowid IN "
+                    "(SELECT rowid FROM validators ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                self.conn.commit()
+
+    def close(self):
+        self.evict()
+        self.conn.close()
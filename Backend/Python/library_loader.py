@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集结果批量入库脚本
+读取GOG/Xbox采集脚本输出的JSON,在一个事务内批量写入游戏库相关表
+(games、game_platform、achievements、player_platform、user_platform_library、
+user_achievements、user_game_library),每张表只需少量批量语句
+
+支持MySQL(需要 pip install pymysql)和用于本地测试的SQLite
+"""
+
+import sys
+import json
+import argparse
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+from gog_get_data import last_session_end
+from title_matcher import TitleIndex
+
+# 与后端控制器中的平台ID一致
+PLATFORM_IDS = {
+    "gog": 5,
+    "xbox": 7,
+}
+
+# 游戏商店页地址(与后端导入时写入的 game_platform_url 一致)
+PLATFORM_URLS = {
+    "gog": "https://www.gog.com/game/{}",
+    "xbox": "https://www.xbox.com/games/store/-/{}",
+}
+
+# IN 查询每批的ID数
+SELECT_CHUNK_SIZE = 500
+
+# 统计为"最近游玩"的天数
+RECENT_DAYS = 14
+
+# SQLite 测试库表结构(与 init.sql 中相关表的主键和唯一约束一致)
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(128) UNIQUE NOT NULL,
+    header_image VARCHAR(2048) NOT NULL,
+    capsile_image VARCHAR(2048) NOT NULL,
+    background VARCHAR(2048) NOT NULL,
+    release_date DATE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS game_platform (
+    game_id BIGINT NOT NULL,
+    platform_id INT NOT NULL,
+    platform_game_id VARCHAR(128) NOT NULL,
+    game_platform_url VARCHAR(2048),
+    PRIMARY KEY (game_id, platform_id)
+);
+CREATE TABLE IF NOT EXISTS achievements (
+    achievement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id BIGINT NOT NULL,
+    achievement_name VARCHAR(128) NOT NULL,
+    displayName VARCHAR(128) NOT NULL,
+    hidden TINYINT(1) NOT NULL DEFAULT 0,
+    description TEXT,
+    icon_unlocked VARCHAR(2048) NOT NULL,
+    icon_locked VARCHAR(2048) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_platform (
+    platform_user_id VARCHAR(128) NOT NULL,
+    platform_id INT NOT NULL,
+    profile_name VARCHAR(128) NOT NULL,
+    profile_url VARCHAR(2048),
+    account_created DATETIME,
+    country VARCHAR(50),
+    PRIMARY KEY (platform_user_id, platform_id)
+);
+CREATE TABLE IF NOT EXISTS user_platform_binding (
+    binding_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    platform_id INT NOT NULL,
+    platform_user_id VARCHAR(128) NOT NULL,
+    binding_status TINYINT(1) NOT NULL DEFAULT 1,
+    UNIQUE (user_id, platform_id)
+);
+CREATE TABLE IF NOT EXISTS user_game_library (
+    user_id INT PRIMARY KEY,
+    total_games_owned INT NOT NULL DEFAULT 0,
+    games_played INT NOT NULL DEFAULT 0,
+    total_playtime_minutes INT NOT NULL DEFAULT 0,
+    total_achievements INT,
+    unlocked_achievements INT,
+    recently_played_count INT NOT NULL DEFAULT 0,
+    recent_playtime_minutes INT NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS user_platform_library (
+    platform_user_id VARCHAR(128) NOT NULL,
+    platform_id INT NOT NULL,
+    game_id BIGINT NOT NULL,
+    playtime_minutes INT NOT NULL DEFAULT 0,
+    last_played DATETIME,
+    achievements_total INT,
+    achievements_unlocked INT,
+    PRIMARY KEY (platform_user_id, platform_id, game_id)
+);
+CREATE TABLE IF NOT EXISTS user_achievements (
+    user_achievement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    achievement_id BIGINT NOT NULL,
+    unlocked TINYINT(1) NOT NULL DEFAULT 0,
+    unlock_time DATETIME,
+    platform_id INT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, achievement_id, platform_id)
+);
+"""
+
+
+def print_info(message):
+    """打印信息"""
+    print(f"INFO: {message}", file=sys.stderr, flush=True)
+
+
+def print_error(message):
+    """打印错误"""
+    print(f"ERROR: {message}", file=sys.stderr, flush=True)
+
+
+def _parse_iso(text: str) -> datetime:
+    """
+    解析ISO时间字符串
+
+    GOG的时间带有 +0000 形式的时区(无冒号),Python 3.11之前的fromisoformat不支持,
+    先按strptime的 %z 解析,其余格式(小数秒、仅日期等)再交给fromisoformat
+    """
+    try:
+        return datetime.strptime(text, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+
+
+def to_datetime(value: Any) -> Optional[str]:
+    """将ISO时间字符串或时间戳转换为数据库DATETIME格式(UTC)"""
+    if value in (None, "", 0):
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            moment = datetime.fromtimestamp(value, timezone.utc)
+        else:
+            moment = _parse_iso(str(value))
+            if moment.tzinfo is not None:
+                moment = moment.astimezone(timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        return None
+    if moment.year <= 1:
+        return None
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def gog_records(result: Dict[str, Any]) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """
+    将GOG采集结果转换为统一的入库记录
+
+    Returns:
+        (平台用户ID, 用户名, 游戏记录列表)
+    """
+    user_data = result.get("userData") or {}
+    records = []
+    for game in result.get("games") or []:
+        details = game.get("details") or game.get("summary") or {}
+        if not details.get("title"):
+            continue
+
+        achievements = None
+        achievement_data = game.get("achievements") or {}
+        items = achievement_data.get("items")
+        if items is not None:
+            achievements = [{
+                "key": str(item.get("achievement_key") or item.get("achievement_id")),
+                "display_name": item.get("name") or "",
+                "description": item.get("description"),
+                "hidden": not item.get("visible", True),
+                "icon_unlocked": item.get("image_url_unlocked") or "",
+                "icon_locked": item.get("image_url_locked") or "",
+                "unlock_time": to_datetime(item.get("date_unlocked")),
+            } for item in items]
+
+        records.append({
+            "platform_game_id": str(game["gameId"]),
+            "name": details["title"],
+            "image": details.get("backgroundImage") or "",
+            "release_date": to_datetime(details.get("releaseTimestamp")),
+            "playtime": game.get("playTimeMinutes") or 0,
+            "last_played": to_datetime(last_session_end(game)),
+            "achievements_total": achievement_data.get("total_count", len(items)) if items is not None else None,
+            "achievements_unlocked": sum(1 for a in achievements if a["unlock_time"]) if achievements is not None else None,
+            "achievements": achievements,
+        })
+    return str(result.get("userId")), user_data.get("username") or str(result.get("userId")), records
+
+
+def xbox_records(data: Dict[str, Any]) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """
+    将Xbox采集结果转换为统一的入库记录
+
+    Returns:
+        (平台用户ID, 玩家代号, 游戏记录列表)
+    """
+    profile = data.get("profile") or {}
+    records = []
+    for title in (data.get("title_history") or {}).get("titles") or []:
+        if not title.get("name"):
+            continue
+        summary = title.get("achievement") or {}
+        history = title.get("title_history") or {}
+
+        achievements = None
+        if title.get("achievements") is not None:
+            achievements = [{
+                "key": str(achievement["id"]),
+                "display_name": achievement.get("name") or "",
+                "description": achievement.get("description"),
+                "hidden": bool(achievement.get("is_secret")),
+                "icon_unlocked": achievement.get("icon") or "",
+                "icon_locked": achievement.get("icon") or "",
+                "unlock_time": to_datetime(achievement.get("time_unlocked")),
+            } for achievement in title["achievements"]]
+
+        records.append({
+            "platform_game_id": str(title["title_id"]),
+            "name": title["name"],
+            "image": title.get("display_image") or "",
+            "release_date": to_datetime((title.get("detail") or {}).get("release_date")),
+            "playtime": title.get("game_time_minutes") if isinstance(title.get("game_time_minutes"), int) else 0,
+            "last_played": to_datetime(history.get("last_time_played")),
+            "achievements_total": summary.get("total_achievements"),
+            "achievements_unlocked": summary.get("current_achievements"),
+            "achievements": achievements,
+        })
+    gamertag = profile.get("gamertag") or profile.get("modern_gamertag") or str(data.get("xuid"))
+    return str(data.get("xuid")), gamertag, records
+
+
+def chunks(values: List[Any], size: int = SELECT_CHUNK_SIZE) -> Iterable[List[Any]]:
+    """按固定大小分批"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def parse_connection_string(connection_string: str) -> Dict[str, Any]:
+    """解析后端 ConnectionStrings:DefaultConnection 格式的MySQL连接字符串"""
+    options = {}
+    for part in connection_string.split(";"):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            options[key.strip().lower()] = value.strip()
+    return {
+        "host": options.get("server", "localhost"),
+        "port": int(options.get("port", 3306)),
+        "user": options.get("user") or options.get("uid"),
+        "password": options.get("password") or options.get("pwd", ""),
+        "database": options.get("database"),
+        "charset": options.get("charset", "utf8mb4"),
+    }
+
+
+class LibraryLoader:
+    """在一个事务内把统一的入库记录批量写入数据库"""
+
+    def __init__(self, connection, dialect: str, match_threshold: Optional[float] = None):
+        self.connection = connection
+        self.dialect = dialect
+        self.cursor = connection.cursor()
+        # 设置时按名称相似度把新游戏匹配到已有游戏(跨平台命名不同)
+        self.match_threshold = match_threshold
+        self._title_index: Optional[TitleIndex] = None
+
+    def _sql(self, sql: str) -> str:
+        """SQL统一使用 ? 占位符,MySQL驱动需要 %s"""
+        return sql.replace("?", "%s") if self.dialect == "mysql" else sql
+
+    def _upsert(self, table: str, columns: List[str], keys: List[str], update: List[str]) -> str:
+        """生成按唯一键插入或更新的语句"""
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        if self.dialect == "mysql":
+            assignments = ", ".join(f"{c} = VALUES({c})" for c in update) or f"{keys[0]} = {keys[0]}"
+            return f"{sql} ON DUPLICATE KEY UPDATE {assignments}"
+        if update:
+            assignments = ", ".join(f"{c} = excluded.{c}" for c in update)
+            return f"{sql} ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {assignments}"
+        return f"{sql} ON CONFLICT ({', '.join(keys)}) DO NOTHING"
+
+    def _executemany(self, sql: str, rows: List[Tuple]):
+        if rows:
+            self.cursor.executemany(self._sql(sql), rows)
+
+    def _select_in(self, sql: str, values: List[Any], params: Tuple = ()) -> List[Tuple]:
+        """分批执行 IN 查询,sql中以 {placeholders} 表示占位符列表"""
+        rows = []
+        for chunk in chunks(values):
+            placeholders = ", ".join("?" for _ in chunk)
+            self.cursor.execute(self._sql(sql.format(placeholders=placeholders)), (*params, *chunk))
+            rows.extend(self.cursor.fetchall())
+        return rows
+
+    def resolve_games(self, platform_id: int, platform: str, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        查找或创建游戏及平台映射
+
+        Returns:
+            {平台游戏ID: game_id}
+        """
+        ids = [r["platform_game_id"] for r in records]
+        game_ids = dict(self._select_in(
+            "SELECT platform_game_id, game_id FROM game_platform "
+            "WHERE platform_id = ? AND platform_game_id IN ({placeholders})",
+            ids, (platform_id,)
+        ))
+
+        missing = [r for r in records if r["platform_game_id"] not in game_ids]
+        if missing and self.match_threshold is not None:
+            missing = self._match_existing(platform_id, platform, missing, game_ids)
+        if missing:
+            # 与后端导入一致: 按名称匹配已有游戏,不存在时创建
+            today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            self._executemany(
+                self._upsert("games", ["name", "header_image", "capsile_image", "background", "release_date"],
+                             ["name"], []),
+                [(r["name"][:128], r["image"], r["image"], r["image"], (r["release_date"] or today)[:10])
+                 for r in missing]
+            )
+            by_name = dict(self._select_in(
+                "SELECT name, game_id FROM games WHERE name IN ({placeholders})",
+                list({r["name"][:128] for r in missing})
+            ))
+            self._executemany(
+                self._upsert("game_platform", ["game_id", "platform_id", "platform_game_id", "game_platform_url"],
+                             ["game_id", "platform_id"], []),
+                [(by_name[r["name"][:128]], platform_id, r["platform_game_id"],
+                  PLATFORM_URLS[platform].format(r["platform_game_id"]))
+                 for r in missing if r["name"][:128] in by_name]
+            )
+            for r in missing:
+                if r["name"][:128] in by_name:
+                    game_ids[r["platform_game_id"]] = by_name[r["name"][:128]]
+        return game_ids
+
+    def _match_existing(self, platform_id: int, platform: str, records: List[Dict[str, Any]],
+                        game_ids: Dict[str, int]) -> List[Dict[str, Any]]:
+        """
+        通过标题索引把记录匹配到已有游戏并写入平台映射
+
+        Returns:
+            没有匹配到已有游戏的记录
+        """
+        if self._title_index is None:
+            self.cursor.execute("SELECT game_id, name FROM games")
+            self._title_index = TitleIndex(self.cursor.fetchall())
+
+        matches = self._title_index.match_many([r["name"] for r in records], self.match_threshold)
+        matched = [(r, m[0]) for r, m in zip(records, matches) if m]
+        self._executemany(
+            self._upsert("game_platform", ["game_id", "platform_id", "platform_game_id", "game_platform_url"],
+                         ["game_id", "platform_id"], []),
+            [(game_id, platform_id, r["platform_game_id"], PLATFORM_URLS[platform].format(r["platform_game_id"]))
+             for r, game_id in matched]
+        )
+        for r, game_id in matched:
+            game_ids[r["platform_game_id"]] = game_id
+        if matched:
+            print_info(f"按标题匹配到 {len(matched)} 个已有游戏")
+        return [r for r, m in zip(records, matches) if not m]
+
+    def resolve_achievements(self, records: List[Dict[str, Any]], game_ids: Dict[str, int]) -> Dict[Tuple[int, str], int]:
+        """
+        查找或创建成就定义
+
+        Returns:
+            {(game_id, 成就名): achievement_id}
+        """
+        wanted = {}
+        for r in records:
+            game_id = game_ids.get(r["platform_game_id"])
+            for a in r["achievements"] or []:
+                if game_id is not None:
+                    wanted[(game_id, a["key"][:128])] = a
+        if not wanted:
+            return {}
+
+        query = "SELECT game_id, achievement_name, achievement_id FROM achievements WHERE game_id IN ({placeholders})"
+        game_list = sorted({game_id for game_id, _ in wanted})
+        existing = {(g, n): i for g, n, i in self._select_in(query, game_list)}
+
+        self._executemany(
+            "INSERT INTO achievements (game_id, achievement_name, displayName, hidden, description, "
+            "icon_unlocked, icon_locked) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(g, n, a["display_name"][:128], int(a["hidden"]), a["description"], a["icon_unlocked"], a["icon_locked"])
+             for (g, n), a in wanted.items() if (g, n) not in existing]
+        )
+        if len(existing) < len(wanted):
+            existing = {(g, n): i for g, n, i in self._select_in(query, game_list)}
+        return existing
+
+    def find_user_id(self, platform_id: int, platform_user_id: str) -> Optional[int]:
+        """通过账号绑定表查找平台账号对应的用户"""
+        self.cursor.execute(self._sql(
+            "SELECT user_id FROM user_platform_binding WHERE platform_id = ? AND platform_user_id = ?"
+        ), (platform_id, platform_user_id))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def load(self, platform: str, platform_user_id: str, profile_name: str,
+             records: List[Dict[str, Any]], user_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        写入一个平台账号的游戏库
+
+        Args:
+            platform: 平台名称(gog / xbox)
+            platform_user_id: 平台侧用户ID
+            profile_name: 平台侧用户名
+            records: gog_records / xbox_records 生成的记录
+            user_id: PlayLinker用户ID,为None时通过账号绑定表查找
+
+        Returns:
+            各表写入的行数
+        """
+        platform_id = PLATFORM_IDS[platform]
+        counts = {}
+
+        self._executemany(
+            self._upsert("player_platform", ["platform_user_id", "platform_id", "profile_name"],
+                         ["platform_user_id", "platform_id"], ["profile_name"]),
+            [(platform_user_id, platform_id, profile_name[:128])]
+        )
+
+        game_ids = self.resolve_games(platform_id, platform, records)
+        library_rows = [
+            (platform_user_id, platform_id, game_ids[r["platform_game_id"]], r["playtime"], r["last_played"],
+             r["achievements_total"], r["achievements_unlocked"])
+            for r in records if r["platform_game_id"] in game_ids
+        ]
+        self._executemany(
+            self._upsert("user_platform_library",
+                         ["platform_user_id", "platform_id", "game_id", "playtime_minutes", "last_played",
+                          "achievements_total", "achievements_unlocked"],
+                         ["platform_user_id", "platform_id", "game_id"],
+                         ["playtime_minutes", "last_played", "achievements_total", "achievements_unlocked"]),
+            library_rows
+        )
+        counts["user_platform_library"] = len(library_rows)
+
+        if user_id is None:
+            user_id = self.find_user_id(platform_id, platform_user_id)
+        if user_id is None:
+            print_info("未找到绑定该平台账号的用户,跳过用户成就和游戏库统计")
+            return counts
+
+        achievement_ids = self.resolve_achievements(records, game_ids)
+        achievement_rows = []
+        for r in records:
+            game_id = game_ids.get(r["platform_game_id"])
+            for a in r["achievements"] or []:
+                achievement_id = achievement_ids.get((game_id, a["key"][:128]))
+                if achievement_id is not None:
+                    achievement_rows.append((user_id, achievement_id, int(bool(a["unlock_time"])),
+                                             a["unlock_time"], platform_id))
+        self._executemany(
+            self._upsert("user_achievements",
+                         ["user_id", "achievement_id", "unlocked", "unlock_time", "platform_id"],
+                         ["user_id", "achievement_id", "platform_id"], ["unlocked", "unlock_time"]),
+            achievement_rows
+        )
+        counts["user_achievements"] = len(achievement_rows)
+
+        # 统一游戏库统计: 汇总该用户所有已绑定平台的游戏记录
+        recent = (datetime.now(timezone.utc) - timedelta(days=RECENT_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+        columns = ["total_games_owned", "games_played", "total_playtime_minutes", "total_achievements",
+                   "unlocked_achievements", "recently_played_count"]
+        if self.dialect == "mysql":
+            conflict = "ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = VALUES({c})" for c in columns)
+        else:
+            conflict = "ON CONFLICT (user_id) DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in columns)
+        self.cursor.execute(self._sql(
+            f"INSERT INTO user_game_library (user_id, {', '.join(columns)}) "
+            "SELECT ?, COUNT(*), "
+            "SUM(CASE WHEN l.playtime_minutes > 0 THEN 1 ELSE 0 END), "
+            "COALESCE(SUM(l.playtime_minutes), 0), SUM(l.achievements_total), SUM(l.achievements_unlocked), "
+            "SUM(CASE WHEN l.last_played >= ? THEN 1 ELSE 0 END) "
+            "FROM user_platform_library l JOIN user_platform_binding b "
+            "ON b.platform_user_id = l.platform_user_id AND b.platform_id = l.platform_id "
+            f"WHERE b.user_id = ? GROUP BY b.user_id {conflict}"
+        ), (user_id, recent, user_id))
+        # 用户没有任何平台游戏记录时不写入;MySQL更新已有行时rowcount为2
+        counts["user_game_library"] = min(max(self.cursor.rowcount, 0), 1)
+        return counts
+
+
+def connect(args) -> Tuple[Any, str]:
+    """根据参数连接数据库,返回(连接, 方言)"""
+    if args.sqlite:
+        connection = sqlite3.connect(args.sqlite)
+        if args.create_schema:
+            connection.executescript(SQLITE_SCHEMA)
+        return connection, "sqlite"
+
+    if pymysql is None:
+        raise RuntimeError("写入MySQL需要安装pymysql: pip install pymysql")
+    return pymysql.connect(autocommit=False, **parse_connection_string(args.mysql)), "mysql"
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='采集结果批量入库')
+    parser.add_argument('--input', help='采集脚本输出的JSON文件(默认读取stdin)')
+    parser.add_argument('--platform', choices=sorted(PLATFORM_IDS), help='平台(默认根据输出格式判断)')
+    parser.add_argument('--user-id', type=int, help='PlayLinker用户ID(默认通过账号绑定表查找)')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--mysql', help='MySQL连接字符串(与后端 ConnectionStrings:DefaultConnection 格式相同)')
+    target.add_argument('--sqlite', help='SQLite数据库文件(本地测试)')
+    parser.add_argument('--create-schema', action='store_true', help='在SQLite中创建相关表')
+    parser.add_argument('--match-threshold', type=float,
+                        help='按标题相似度(0~1)把新游戏匹配到已有游戏,如0.8;默认只按名称精确匹配')
+
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = json.load(sys.stdin)
+
+    if not data.get("success", False):
+        print_error("采集结果不是成功的完整结果")
+        sys.exit(1)
+    if "diff" in data or "diff" in (data.get("title_history") or {}):
+        print_error("不支持 --diff 模式的输出,请使用完整采集结果")
+        sys.exit(1)
+
+    platform = args.platform or ("gog" if "games" in data else "xbox")
+    platform_user_id, profile_name, records = (gog_records if platform == "gog" else xbox_records)(data)
+
+    connection, dialect = connect(args)
+    try:
+        counts = LibraryLoader(connection, dialect, args.match_threshold).load(
+            platform, platform_user_id, profile_name, records, args.user_id
+        )
+        connection.commit()
+    except Exception as e:
+        connection.rollback()
+        print_error(f"入库失败,已回滚: {e}")
+        sys.exit(1)
+    finally:
+        connection.close()
+
+    print(json.dumps({"success": True, "platform": platform, "games": len(records), "rows": counts},
+                     ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
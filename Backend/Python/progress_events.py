@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集进度事件
+采集脚本按阶段报告已完成数量和总数,并根据最近完成的工作估算吞吐量和剩余时间;
+事件以 "PROGRESS: {json}" 行输出到stderr,也可以原子写入进度文件供后端轮询
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+# 估算吞吐量时使用的最近完成记录数
+DEFAULT_WINDOW = 20
+
+# 两次输出事件的最小间隔(秒),阶段开始和结束时总是输出
+DEFAULT_MIN_INTERVAL = 0.5
+
+
+def result_status(result: Dict[str, Any]) -> str:
+    """根据采集结果得到结束时的进度状态: completed / partial / failed"""
+    if not result.get("success", False):
+        return "failed"
+    return "partial" if result.get("partial") else "completed"
+
+
+class ProgressSink:
+    """
+    进度事件的输出目标
+
+    多个来源(如同时采集的GOG和Xbox)可以共用一个输出目标,进度文件中按来源保存各自最新的事件
+    """
+
+    def __init__(self, path: Optional[str] = None, stream: bool = False):
+        self.path = path
+        self.stream = stream
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path or self.stream)
+
+    def emit(self, event: Dict[str, Any]):
+        """输出一个事件"""
+        with self.lock:
+            if self.stream:
+                print(f"PROGRESS: {json.dumps(event, ensure_ascii=False)}", file=sys.stderr, flush=True)
+            if self.path:
+                self.latest[event["source"]] = event
+                self._write({"updated": event["timestamp"], "sources": self.latest})
+
+    def _write(self, data: Dict[str, Any]):
+        """原子写入进度文件,读取方不会读到写了一半的内容"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # 进度只用于展示,写入失败不影响采集
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class ProgressReporter:
+    """
+    一个来源的进度
+
+    吞吐量按最近 window 项工作的完成时间计算,并发执行时同样适用;
+    剩余时间 = 剩余数量 / 吞吐量
+    """
+
+    def __init__(self, source: str, sink: Optional[ProgressSink] = None,
+                 window: int = DEFAULT_WINDOW, min_interval: float = DEFAULT_MIN_INTERVAL):
+        self.source = source
+        self.sink = sink or ProgressSink()
+        self.min_interval = min_interval
+        self.started = time.monotonic()
+        self.phase_name: Optional[str] = None
+        self.phase_started = self.started
+        self.total: Optional[int] = None
+        self.done = 0
+        self.completions = deque(maxlen=window)
+        self.last_emit = 0.0
+        self.lock = threading.Lock()
+
+    def phase(self, name: str, total: Optional[int] = None):
+        """
+        开始一个新阶段
+
+        Args:
+            name: 阶段名称(如 listing、games、achievements)
+            total: 该阶段的工作总数,未知时为None
+        """
+        with self.lock:
+            self.phase_name = name
+            self.phase_started = time.monotonic()
+            self.total = total
+            self.done = 0
+            self.completions.clear()
+            self.completions.append(self.phase_started)
+            self._emit(force=True)
+
+    def advance(self, count: int = 1, measured: bool = True):
+        """
+        记录完成的工作
+
+        Args:
+            count: 完成的数量
+            measured: 是否计入吞吐量;从断点日志或缓存直接得到的项目几乎不耗时,
+                      计入会高估吞吐量并低估剩余时间
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.done += count
+            if measured:
+                for _ in range(count):
+                    self.completions.append(now)
+            self._emit(force=self.total is not None and self.done >= self.total)
+
+    def finish(self, status: str = "completed"):
+        """结束采集"""
+        with self.lock:
+            self.phase_name = status
+            self.total = self.done if self.total is None else self.total
+            self._emit(force=True, finished=True)
+
+    def rate(self) -> Optional[float]:
+        """最近的吞吐量(项/秒),完成记录不足时为None"""
+        if len(self.completions) < 2:
+            return None
+        span = self.completions[-1] - self.completions[0]
+        if span <= 0:
+            return None
+        return (len(self.completions) - 1) / span
+
+    def eta(self) -> Optional[float]:
+        """当前阶段的预计剩余秒数"""
+        if self.total is None:
+            return None
+        remaining = max(self.total - self.done, 0)
+        if remaining == 0:
+            return 0.0
+        rate = self.rate()
+        return remaining / rate if rate else None
+
+    def _emit(self, force: bool = False, finished: bool = False):
+        if not self.sink.enabled:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_emit < self.min_interval:
+            return
+        self.last_emit = now
+        rate = self.rate()
+        eta = 0.0 if finished else self.eta()
+        self.sink.emit({
+            "source": self.source,
+            "phase": self.phase_name,
+            "done": self.done,
+            "total": self.total,
+            "rate": round(rate, 3) if rate else None,
+            "eta": round(eta, 1) if eta is not None else None,
+            "elapsed": round(now - self.started, 1),
+            "finished": finished,
+            "timestamp": time.time(),
+        })
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已绑定账户后台刷新调度脚本
+按快照陈旧程度和用户活跃度为GOG/Xbox账户排定优先级并加入随机抖动,
+在全局并发数和速率预算内后台运行采集脚本,使查询接口读取到足够新的快照
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import random
+import asyncio
+import argparse
+from typing import Dict, Any, Optional, List
+
+from snapshot_store import SnapshotStore
+from catalog_cache import DEFAULT_CACHE_DIR
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 默认令牌目录: Backend/Tokens
+DEFAULT_TOKENS_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "Tokens")
+
+# 各平台对应的采集脚本
+COLLECTOR_SCRIPTS = {
+    "gog": "gog_get_data.py",
+    "xbox": "xbox_get_data.py",
+}
+
+DAY = 24 * 3600
+
+
+def print_info(message):
+    """打印信息"""
+    print(f"INFO: {message}", file=sys.stderr, flush=True)
+
+
+def print_error(message):
+    """打印错误"""
+    print(f"ERROR: {message}", file=sys.stderr, flush=True)
+
+
+def read_user_key(tokens_path: str) -> Optional[str]:
+    """从令牌文件读取用户ID(与采集脚本保存快照时使用的键一致)"""
+    try:
+        with open(tokens_path, 'r', encoding='utf-8') as f:
+            user_id = json.load(f).get("user_id")
+        return str(user_id) if user_id else None
+    except (OSError, ValueError):
+        return None
+
+
+def load_accounts(accounts_file: Optional[str], tokens_dir: str) -> List[Dict[str, Any]]:
+    """
+    加载需要刷新的账户
+
+    Args:
+        accounts_file: 账户列表JSON文件,每项包含 platform、tokens 和可选的 lastActive(时间戳)
+        tokens_dir: 未提供账户列表时,扫描该目录下的 gog*_tokens.json / xbox*_tokens.json
+
+    Returns:
+        账户列表
+    """
+    if accounts_file:
+        with open(accounts_file, 'r', encoding='utf-8') as f:
+            accounts = json.load(f)
+    else:
+        accounts = []
+        if os.path.isdir(tokens_dir):
+            for name in sorted(os.listdir(tokens_dir)):
+                for platform in COLLECTOR_SCRIPTS:
+                    if name.startswith(platform) and name.endswith("_tokens.json"):
+                        accounts.append({"platform": platform, "tokens": os.path.join(tokens_dir, name)})
+
+    result = []
+    for account in accounts:
+        if account.get("platform") not in COLLECTOR_SCRIPTS:
+            print_error(f"不支持的平台: {account.get('platform')}")
+            continue
+        account["userKey"] = read_user_key(account["tokens"])
+        account["failures"] = 0
+        result.append(account)
+    return result
+
+
+class RateBudget:
+    """令牌桶速率预算,限制单位时间内启动的采集次数"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        """等待直到有可用的预算"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RefreshScheduler:
+    """按到期时间排序的账户刷新优先队列"""
+
+    def __init__(self, accounts: List[Dict[str, Any]], cache_dir: str, interval: float,
+                 jitter: float, concurrency: int, rate_per_minute: float, timeout: float):
+        self.cache_dir = cache_dir
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.budget = RateBudget(rate_per_minute)
+        self.queue = []
+        self._seq = 0
+        self.running = set()
+
+        now = time.time()
+        for account in accounts:
+            self.schedule(account, self.next_due(account, self.last_refresh(account), now))
+
+    def last_refresh(self, account: Dict[str, Any]) -> float:
+        """账户快照的保存时间,没有快照时返回0(最陈旧)"""
+        if not account.get("userKey"):
+            return 0.0
+        path = SnapshotStore(self.cache_dir, account["platform"], account["userKey"]).path
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return 0.0
+
+    def refresh_interval(self, account: Dict[str, Any], now: float) -> float:
+        """活跃用户使用基础间隔,长期不活跃的用户逐步放宽刷新间隔"""
+        last_active = account.get("lastActive")
+        if last_active is None:
+            return self.interval * 4
+        idle = now - float(last_active)
+        if idle < DAY:
+            return self.interval
+        if idle < 7 * DAY:
+            return self.interval * 4
+        return self.interval * 12
+
+    def next_due(self, account: Dict[str, Any], last_refresh: float, now: float) -> float:
+        """
+        计算下一次刷新时间,加入随机抖动避免同一时刻集中刷新
+
+        已过期的账户保留过期程度作为优先级(越陈旧越靠前),并在其上叠加抖动
+        """
+        interval = self.refresh_interval(account, now)
+        return last_refresh + interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def schedule(self, account: Dict[str, Any], due: float):
+        """将账户加入优先队列"""
+        self._seq += 1
+        heapq.heappush(self.queue, (due, self._seq, account))
+
+    async def collect(self, account: Dict[str, Any]) -> bool:
+        """运行一次采集脚本,结果由采集脚本写入快照"""
+        script = os.path.join(SCRIPT_DIR, COLLECTOR_SCRIPTS[account["platform"]])
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, script, "--tokens", account["tokens"], "--cache-dir", self.cache_dir,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            await asyncio.wait_for(process.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            print_error(f"采集超时: {account['platform']} {account['tokens']}")
+            return False
+        return process.returncode == 0
+
+    async def _run_one(self, account: Dict[str, Any]):
+        """执行单个账户的刷新并重新排期"""
+        started = time.time()
+        try:
+            ok = await self.collect(account)
+        except Exception as e:
+            print_error(f"启动采集失败: {e}")
+            ok = False
+        finally:
+            self.semaphore.release()
+
+        now = time.time()
+        if ok:
+            account["failures"] = 0
+            account["userKey"] = account.get("userKey") or read_user_key(account["tokens"])
+            print_info(f"刷新完成: {account['platform']} {account['tokens']} ({now - started:.1f}秒)")
+            self.schedule(account, self.next_due(account, now, now))
+        else:
+            # 失败后指数退避,不超过正常刷新间隔
+            account["failures"] += 1
+            backoff = min(self.refresh_interval(account, now), 60 * 2 ** account["failures"])
+            print_error(f"刷新失败: {account['platform']} {account['tokens']},{backoff:.0f}秒后重试")
+            self.schedule(account, now + backoff * (1 + random.uniform(0, self.jitter)))
+
+    async def run(self, once: bool = False):
+        """
+        调度主循环
+
+        Args:
+            once: 只刷新当前已到期的账户,全部完成后退出
+        """
+        while self.queue or self.running:
+            if not self.queue:
+                # 所有账户都在刷新中,等待任一完成后重新排期
+                await asyncio.wait(set(self.running), return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            due, _, account = self.queue[0]
+            wait = due - time.time()
+            if wait > 0:
+                if once:
+                    break
+                await asyncio.sleep(min(wait, 60))
+                continue
+
+            heapq.heappop(self.queue)
+            await self.budget.acquire()
+            await self.semaphore.acquire()
+            task = asyncio.create_task(self._run_one(account))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+        if self.running:
+            await asyncio.gather(*self.running)
+
+
+async def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='已绑定账户后台刷新调度')
+    parser.add_argument('--accounts', help='账户列表JSON文件(默认扫描令牌目录)')
+    parser.add_argument('--tokens-dir', default=DEFAULT_TOKENS_DIR, help='令牌目录(默认: Backend/Tokens)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='共享缓存目录(默认: Backend/Cache)')
+    parser.add_argument('--interval', type=float, default=3600,
+                        help='活跃用户的刷新间隔(秒,默认3600);加上抖动后应不超过后端的 SnapshotMaxAgeSeconds(默认4500)')
+    parser.add_argument('--jitter', type=float, default=0.2, help='刷新时间随机抖动比例(默认0.2)')
+    parser.add_argument('--concurrency', type=int, default=2, help='同时运行的采集数(默认2)')
+    parser.add_argument('--rate', type=float, default=6, help='每分钟最多启动的采集数(默认6)')
+    parser.add_argument('--timeout', type=float, default=600, help='单次采集超时(秒,默认600)')
+    parser.add_argument('--once', action='store_true', help='只刷新当前已到期的账户后退出')
+
+    args = parser.parse_args()
+
+    accounts = load_accounts(args.accounts, args.tokens_dir)
+    print_info(f"共 {len(accounts)} 个已绑定账户")
+
+    scheduler = RefreshScheduler(
+        accounts, args.cache_dir, args.interval, args.jitter,
+        args.concurrency, args.rate, args.timeout
+    )
+    await scheduler.run(once=args.once)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print_info("调度已停止")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单次运行内的请求去重
+按(主机, 端点, 参数)记录已完成请求的结果,相同请求再次发出时直接返回结果;
+并发发出的相同请求只有第一个访问网络,其余等待并共享其结果
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def request_key(host: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+    """生成请求键,参数顺序不影响结果"""
+    return (host, endpoint, tuple(sorted((params or {}).items())))
+
+
+class RequestMemo:
+    """
+    请求结果备忘和单飞(single-flight)
+
+    失败的结果(None)不保存,之后的相同请求(例如刷新令牌后的重试)会重新访问网络
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[Hashable, Any] = {}
+        self._inflight: Dict[Hashable, threading.Event] = {}
+        self.hits = 0
+
+    def call(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """
+        执行请求或复用相同请求的结果
+
+        Args:
+            key: 请求键
+            fetch: 实际发出请求的函数
+
+        Returns:
+            请求结果(复用时返回副本,调用方可以自由修改)
+        """
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                return copy.deepcopy(self._results[key])
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not leader:
+            # 等待正在进行的相同请求完成并共享结果,该请求失败时返回None
+            event.wait()
+            with self._lock:
+                self.hits += 1
+                return copy.deepcopy(self._results.get(key))
+
+        result = None
+        try:
+            result = fetch()
+            return result
+        finally:
+            with self._lock:
+                if result is not None:
+                    # 保存副本,调用方修改返回值不影响之后的复用
+                    self._results[key] = copy.deepcopy(result)
+                del self._inflight[key]
+            event.set()
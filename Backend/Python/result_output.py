@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集结果输出
+指定输出文件时原子写入完整结果,stdout只输出一行状态;后端直接从文件流式解析,
+几MB的结果不再经过管道和逐行拼接的字符串
+"""
+
+import os
+import json
+import tempfile
+from typing import Dict, Any, Optional
+
+
+def write_result(data: Dict[str, Any], path: Optional[str] = None):
+    """
+    输出采集结果
+
+    Args:
+        data: 采集结果
+        path: 输出文件路径;为None时把完整结果输出到stdout
+
+    指定路径时先写入同目录下的临时文件再替换,读取方不会读到写了一半的文件;
+    stdout输出一行状态: {"success", "partial", "output", "bytes"}
+    """
+    if not path:
+        print(json.dumps(data, ensure_ascii=False, indent=2), flush=True)
+        return
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    print(json.dumps({
+        "success": data.get("success", True),
+        "partial": bool(data.get("partial")),
+        "output": os.path.abspath(path),
+        "bytes": os.path.getsize(path),
+    }, ensure_ascii=False), flush=True)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集结果变更检测
+为每条游戏记录保存上次运行时的内容哈希,输出新增、删除和变更的记录及字段级差异,
+使下游数据库写入量与变更量而不是游戏库大小成正比
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from typing import Dict, Any, List, Optional, Tuple
+
+
+def content_hash(value: Any) -> str:
+    """计算JSON值的规范化内容哈希"""
+    canonical = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def flatten_fields(record: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """
+    将嵌套字典展开为以点号连接的字段路径,列表作为整体处理
+
+    Args:
+        record: 游戏记录
+        prefix: 字段路径前缀
+
+    Returns:
+        {字段路径: 值} 字典
+    """
+    fields = {}
+    for key, value in record.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            fields.update(flatten_fields(value, f"{path}."))
+        else:
+            fields[path] = value
+    return fields
+
+
+def compute_diff(previous: Dict[str, Any], records: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    与上次的哈希状态比较,计算记录差异
+
+    Args:
+        previous: 上次保存的状态 {record_id: {"hash": ..., "fields": {路径: 哈希}}}
+        records: 本次的记录 {record_id: 记录}
+
+    Returns:
+        (差异结果, 新状态)
+    """
+    diff = {"added": [], "removed": [], "changed": [], "unchanged": 0}
+    state = {}
+
+    for record_id, record in records.items():
+        record_hash = content_hash(record)
+        old = previous.get(record_id)
+
+        if old and old.get("hash") == record_hash:
+            # 内容未变化时直接沿用上次的字段哈希,不再展开计算
+            state[record_id] = old
+            diff["unchanged"] += 1
+            continue
+
+        fields = flatten_fields(record)
+        field_hashes = {path: content_hash(value) for path, value in fields.items()}
+        state[record_id] = {"hash": record_hash, "fields": field_hashes}
+
+        if not old:
+            diff["added"].append(record)
+            continue
+
+        old_fields = old.get("fields", {})
+        changed_fields = {
+            path: fields[path]
+            for path, field_hash in field_hashes.items()
+            if old_fields.get(path) != field_hash
+        }
+        removed_fields = [path for path in old_fields if path not in field_hashes]
+        change = {"id": record_id, "fields": changed_fields}
+        if removed_fields:
+            change["removedFields"] = removed_fields
+        diff["changed"].append(change)
+
+    diff["removed"] = [record_id for record_id in previous if record_id not in records]
+    return diff, state
+
+
+class SnapshotDiff:
+    """按平台和用户保存哈希状态并计算差异"""
+
+    def __init__(self, cache_dir: str, platform: str, user_id: str):
+        self.path = os.path.join(cache_dir, "state", "diff", f"{platform}_{user_id}.json")
+
+    def load_state(self) -> Dict[str, Any]:
+        """读取上次运行保存的哈希状态"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self, state: Dict[str, Any]):
+        """原子写入哈希状态"""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def diff(self, records: List[Dict[str, Any]], key: str,
+             skip: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        计算本次记录与上次运行的差异,并保存新的哈希状态
+
+        Args:
+            records: 本次采集的记录列表
+            key: 记录ID字段名
+            skip: 本次未完整采集的记录ID,不参与比较并保留上次的哈希状态
+
+        Returns:
+            {"added": [...], "removed": [...], "changed": [...], "unchanged": n}
+        """
+        skip = set(str(record_id) for record_id in skip or [])
+        previous = self.load_state()
+        current = {
+            str(record.get(key)): record
+            for record in records
+            if str(record.get(key)) not in skip
+        }
+        kept = {record_id: previous.pop(record_id) for record_id in skip if record_id in previous}
+
+        diff, state = compute_diff(previous, current)
+        state.update(kept)
+        self.save_state(state)
+        return diff
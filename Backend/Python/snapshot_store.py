@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+用户采集快照存储
+每次采集结果按用户保存为一个快照文件,读取时内存映射并按游戏ID索引,
+查询单个游戏或整个用户数据时无需重新抓取
+
+文件格式:
+    每条游戏记录一行JSON
+    索引行: {"createdAt": ..., "meta": {...}, "index": {id: [offset, length]}}
+    文件尾: 索引行偏移(8字节小端) + 魔数
+"""
+
+import os
+import mmap
+import json
+import time
+import struct
+import tempfile
+from typing import Dict, Any, Optional, List, Iterator
+
+SNAPSHOT_MAGIC = b"PLSNAP01"
+_FOOTER = struct.Struct("<Q")
+_FOOTER_SIZE = _FOOTER.size + len(SNAPSHOT_MAGIC)
+
+
+class Snapshot:
+    """内存映射的只读快照"""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("快照文件为空")
+
+        if len(self._mm) < _FOOTER_SIZE or self._mm[-len(SNAPSHOT_MAGIC):] != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError("快照文件格式无效")
+
+        (index_offset,) = _FOOTER.unpack_from(self._mm, len(self._mm) - _FOOTER_SIZE)
+        header = json.loads(self._mm[index_offset:len(self._mm) - _FOOTER_SIZE])
+        self.created_at = header["createdAt"]
+        self.meta = header["meta"]
+        self._index = header["index"]
+
+    def age(self) -> float:
+        """快照距今的秒数"""
+        return time.time() - self.created_at
+
+    def ids(self) -> List[str]:
+        """快照中所有记录的ID(保持写入顺序)"""
+        return list(self._index)
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """按ID读取单条记录,只解析该记录所在的字节区间"""
+        location = self._index.get(str(record_id))
+        if location is None:
+            return None
+        offset, length = location
+        return json.loads(self._mm[offset:offset + length])
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """按写入顺序遍历所有记录"""
+        for record_id in self._index:
+            yield self.get(record_id)
+
+    def close(self):
+        """释放内存映射和文件句柄"""
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SnapshotStore:
+    """按平台和用户保存采集快照"""
+
+    def __init__(self, cache_dir: str, platform: str, user_key: str):
+        self.path = os.path.join(cache_dir, "snapshots", f"{platform}_{user_key}.snap")
+
+    def save(self, meta: Dict[str, Any], records: List[Dict[str, Any]], key: str,
+             keep_previous: Optional[List[str]] = None):
+        """
+        原子写入快照
+
+        Args:
+            meta: 游戏列表以外的数据(用户信息等)
+            records: 游戏记录列表
+            key: 记录ID字段名
+            keep_previous: 本次未完整采集的记录ID,沿用上一个快照中的记录
+        """
+        if keep_previous:
+            records = self._with_previous(records, key, keep_previous)
+
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                index = {}
+                offset = 0
+                for record in records:
+                    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                    index[str(record.get(key))] = [offset, len(line)]
+                    f.write(line + b"\n")
+                    offset += len(line) + 1
+
+                header = json.dumps({
+                    "createdAt": time.time(),
+                    "meta": meta,
+                    "index": index
+                }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                f.write(header)
+                f.write(_FOOTER.pack(offset))
+                f.write(SNAPSHOT_MAGIC)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _with_previous(self, records: List[Dict[str, Any]], key: str,
+                       ids: List[str]) -> List[Dict[str, Any]]:
+        """用上一个快照中的记录替换(或补充)指定ID的记录"""
+        previous = self.open()
+        if not previous:
+            return records
+        with previous:
+            kept = {str(record_id): previous.get(record_id) for record_id in ids}
+        kept = {record_id: record for record_id, record in kept.items() if record is not None}
+
+        merged = [kept.pop(str(record.get(key)), record) for record in records]
+        merged.extend(kept.values())
+        return merged
+
+    def open(self, max_age: Optional[float] = None) -> Optional[Snapshot]:
+        """
+        打开快照
+
+        Args:
+            max_age: 最大允许的快照时长(秒),为None时不检查
+
+        Returns:
+            快照对象,不存在、损坏或已过期返回None
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            snapshot = Snapshot(self.path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if max_age is not None and snapshot.age() > max_age:
+            snapshot.close()
+            return None
+        return snapshot
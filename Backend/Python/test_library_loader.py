@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+library_loader 的单元测试
+运行: python -m unittest test_library_loader(或 python -m pytest test_library_loader.py)
+"""
+
+import sqlite3
+import unittest
+
+from library_loader import SQLITE_SCHEMA, LibraryLoader, gog_records, to_datetime
+
+# GOG成就接口返回的解锁时间(时区不带冒号)
+GOG_UNLOCK_TIME = "2021-05-12T18:32:45+0000"
+
+GOG_RESULT = {
+    "userId": "48628349957132247",
+    "userData": {"username": "tester"},
+    "games": [{
+        "gameId": 1207658924,
+        "details": {"title": "Unreal Tournament 2004", "releaseTimestamp": 1079395200},
+        "playTimeMinutes": 90,
+        "achievements": {
+            "total_count": 2,
+            "items": [
+                {"achievement_key": "first_blood", "name": "First Blood", "date_unlocked": GOG_UNLOCK_TIME},
+                {"achievement_key": "godlike", "name": "Godlike", "date_unlocked": None},
+            ],
+        },
+    }],
+}
+
+
+class ToDatetimeTest(unittest.TestCase):
+
+    def test_gog_offset_without_colon(self):
+        self.assertEqual(to_datetime(GOG_UNLOCK_TIME), "2021-05-12 18:32:45")
+        self.assertEqual(to_datetime("2021-05-12T20:32:45+0200"), "2021-05-12 18:32:45")
+
+    def test_other_formats(self):
+        self.assertEqual(to_datetime("2021-05-12T18:32:45Z"), "2021-05-12 18:32:45")
+        self.assertEqual(to_datetime("2021-05-12T18:32:45.123456Z"), "2021-05-12 18:32:45")
+        self.assertEqual(to_datetime("2021-05-12"), "2021-05-12 00:00:00")
+        self.assertEqual(to_datetime(1079395200), "2004-03-16 00:00:00")
+
+    def test_invalid_values(self):
+        self.assertIsNone(to_datetime(None))
+        self.assertIsNone(to_datetime(""))
+        self.assertIsNone(to_datetime("0001-01-01T00:00:00Z"))
+        self.assertIsNone(to_datetime("not a date"))
+
+
+class LibraryLoaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.executescript(SQLITE_SCHEMA)
+        self.loader = LibraryLoader(self.connection, "sqlite")
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_unlock_time_is_stored(self):
+        platform_user_id, name, records = gog_records(GOG_RESULT)
+        self.loader.load("gog", platform_user_id, name, records, user_id=1)
+        unlocks = self.connection.execute(
+            "SELECT unlocked, unlock_time FROM user_achievements ORDER BY achievement_id").fetchall()
+        self.assertEqual(unlocks, [(1, "2021-05-12 18:32:45"), (0, None)])
+
+    def test_library_summary_needs_a_binding(self):
+        platform_user_id, name, records = gog_records(GOG_RESULT)
+        counts = self.loader.load("gog", platform_user_id, name, records, user_id=1)
+        self.assertEqual(counts["user_game_library"], 0)
+        self.assertEqual(self.connection.execute("SELECT COUNT(*) FROM user_game_library").fetchone()[0], 0)
+
+        self.connection.execute(
+            "INSERT INTO user_platform_binding (user_id, platform_id, platform_user_id) VALUES (1, 5, ?)",
+            (platform_user_id,))
+        counts = self.loader.load("gog", platform_user_id, name, records, user_id=1)
+        self.assertEqual(counts["user_game_library"], 1)
+        summary = self.connection.execute(
+            "SELECT user_id, total_games_owned, total_playtime_minutes, unlocked_achievements "
+            "FROM user_game_library").fetchall()
+        self.assertEqual(summary, [(1, 1, 90, 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
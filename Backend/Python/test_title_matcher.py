@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+title_matcher 的单元测试
+运行: python -m unittest test_title_matcher(或 python -m pytest test_title_matcher.py)
+"""
+
+import unittest
+
+from title_matcher import TitleIndex, normalize_title, sequel_numbers
+
+# 同一系列的不同作品,默认阈值下不能互相匹配
+SERIES_PAIRS = [
+    ("Assassin's Creed II", "Assassin's Creed III"),
+    ("Final Fantasy XII", "Final Fantasy XIII"),
+    ("Grand Theft Auto V", "Grand Theft Auto IV"),
+    ("Call of Duty: Black Ops III", "Call of Duty: Black Ops II"),
+    ("Far Cry 4", "Far Cry 5"),
+    ("Battlefield 1", "Battlefield 4"),
+    ("Portal", "Portal 2"),
+    ("Mega Man X", "Mega Man 10"),
+    ("Final Fantasy X", "Final Fantasy"),
+]
+
+# 各平台对同一游戏的不同写法,应当匹配
+SAME_GAME_PAIRS = [
+    ("The Witcher 3: Wild Hunt - Game of the Year Edition", "The Witcher 3: Wild Hunt"),
+    ("DOOM Eternal™", "DOOM Eternal"),
+    ("Assassin's Creed® II", "Assassin's Creed 2"),
+    ("Final Fantasy XIII", "FINAL FANTASY XIII"),
+    ("Mega Man X", "MEGA MAN X"),
+    ("Grand Theft Auto V", "Grand Theft Auto V (PC)"),
+]
+
+
+class SequelNumbersTest(unittest.TestCase):
+
+    def test_roman_numerals_are_converted(self):
+        self.assertEqual(normalize_title("Final Fantasy XIII"), "final fantasy 13")
+        self.assertEqual(normalize_title("Final Fantasy XII"), "final fantasy 12")
+        self.assertEqual(normalize_title("Dragon Quest XI"), "dragon quest 11")
+        self.assertEqual(normalize_title("Mix"), "mix")
+
+    def test_single_letters_are_not_converted(self):
+        self.assertEqual(normalize_title("Mega Man X"), "mega man x")
+        self.assertEqual(sequel_numbers(normalize_title("Mega Man X")), ("x",))
+        self.assertEqual(sequel_numbers(normalize_title("Mega Man 10")), ("10",))
+        self.assertEqual(sequel_numbers(normalize_title("Grand Theft Auto V")), ("v",))
+
+    def test_multi_letter_roman_numerals(self):
+        self.assertEqual(sequel_numbers(normalize_title("Assassin's Creed III")), ("3",))
+        self.assertEqual(sequel_numbers(normalize_title("Call of Duty: Black Ops II")), ("2",))
+
+
+class TitleIndexTest(unittest.TestCase):
+
+    def test_series_entries_do_not_match(self):
+        for catalog_title, query in SERIES_PAIRS:
+            for a, b in ((catalog_title, query), (query, catalog_title)):
+                with self.subTest(catalog=a, query=b):
+                    self.assertIsNone(TitleIndex([(1, a)]).match(b))
+
+    def test_series_picks_the_right_entry(self):
+        index = TitleIndex(enumerate(title for pair in SERIES_PAIRS for title in pair))
+        for position, title in enumerate(title for pair in SERIES_PAIRS for title in pair):
+            with self.subTest(title=title):
+                self.assertEqual(index.match(title), (position, 1.0))
+
+    def test_same_game_matches(self):
+        for catalog_title, query in SAME_GAME_PAIRS:
+            with self.subTest(catalog=catalog_title, query=query):
+                match = TitleIndex([(1, catalog_title)]).match(query)
+                self.assertIsNotNone(match)
+                self.assertEqual(match[0], 1)
+
+    def test_small_catalog_keeps_the_only_candidate(self):
+        # 小目录中正确条目的三元组都超过 MAX_DOCUMENT_FREQUENCY 的比例,
+        # 只按少见的三元组("lz ")筛选会只剩无关条目,丢掉唯一的正确候选
+        entries = [(i, f"Dead Cells {i}") for i in range(2, 12)] + [(100, "Dead Cells"), (200, "Lz Tool")]
+        match = TitleIndex(entries).match("Dead Cellz")
+        self.assertIsNotNone(match)
+        self.assertEqual(match[0], 100)
+
+    def test_candidates_with_other_numbers_do_not_crowd_out(self):
+        # 同一系列的大量其他作品不占用精确打分的候选名额
+        entries = [(i, f"Need for Speed {i}") for i in range(2, 40)] + [(100, "Need for Speed")]
+        match = TitleIndex(entries).match("Need for Speed™", candidates=5)
+        self.assertEqual(match[0], 100)
+
+    def test_match_many_keeps_order(self):
+        index = TitleIndex([(1, "Far Cry 4"), (2, "Far Cry 5")])
+        results = index.match_many(["Far Cry 5", "Far Cry 3", "Far Cry 4"])
+        self.assertEqual([r[0] if r else None for r in results], [2, None, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨平台游戏标题匹配
+对游戏名称做规范化(大小写、符号、商标、版本后缀等),建立字符三元组倒排索引,
+通过倒排表筛选少量候选后再精确打分,匹配时间与目录大小基本无关;
+名称中的数字和罗马数字(续作编号)必须完全一致,同一系列的不同作品不会互相匹配
+"""
+
+import re
+import sys
+import json
+import argparse
+import unicodedata
+from collections import Counter
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+# 规范化时去除的版本后缀(各平台对同一游戏的命名差异)
+EDITION_SUFFIXES = (
+    "game of the year edition", "goty edition", "goty", "definitive edition", "complete edition",
+    "enhanced edition", "deluxe edition", "standard edition", "ultimate edition", "gold edition",
+    "remastered", "for windows 10", "windows 10 edition", "windows edition", "pc edition",
+    "xbox one edition", "xbox series x s", "xbox one", "pc",
+)
+
+# 默认匹配阈值(三元组Dice系数)
+DEFAULT_THRESHOLD = 0.8
+
+# 精确打分的最大候选数
+DEFAULT_CANDIDATES = 20
+
+# 出现在超过该比例条目中的三元组不用于筛选候选(如 "the"),避免遍历过长的倒排表
+MAX_DOCUMENT_FREQUENCY = 0.05
+
+# 倒排表长度不超过该值时总是用于筛选,小目录不剪枝,避免丢掉唯一的正确候选
+MIN_PRUNED_POSTINGS = 1000
+
+_SYMBOLS = re.compile(r"[™®©]")
+_NON_WORD = re.compile(r"[^0-9a-z\u4e00-\u9fff]+")
+# 两个字母以上的罗马数字(ii ~ xxxix)转换为阿拉伯数字;
+# 单字母的 v/x 常是名称的一部分(如 Mega Man X),不转换,但仍作为续作编号参与比较
+_ROMAN = re.compile(r"^(x{0,3})(ix|iv|v?i{0,3})$")
+_ROMAN_VALUES = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9}
+_SEQUEL_LETTERS = ("v", "x")
+
+
+def _roman_to_arabic(token: str) -> str:
+    """转换多字母罗马数字,其他单词原样返回"""
+    if len(token) < 2 or token.strip("ivx"):
+        return token
+    match = _ROMAN.match(token)
+    if not match:
+        return token
+    tens, units = match.groups()
+    return str(10 * len(tens) + _ROMAN_VALUES.get(units, 0))
+
+
+def normalize_title(title: str) -> str:
+    """
+    规范化游戏名称
+
+    Args:
+        title: 原始名称
+
+    Returns:
+        小写、去除重音/符号/版本后缀、罗马数字转为阿拉伯数字后的名称
+    """
+    text = unicodedata.normalize("NFKD", _SYMBOLS.sub("", title or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("&", " and ")
+    text = _NON_WORD.sub(" ", text).strip()
+
+    changed = True
+    while changed:
+        changed = False
+        for suffix in EDITION_SUFFIXES:
+            if text.endswith(" " + suffix):
+                text = text[:-len(suffix) - 1].strip()
+                changed = True
+
+    return " ".join(_roman_to_arabic(token) for token in text.split())
+
+
+def sequel_numbers(normalized: str) -> Tuple[str, ...]:
+    """
+    规范化名称中的续作编号
+
+    Returns:
+        按出现顺序的数字(罗马数字已转换)和单字母 v/x
+    """
+    return tuple(token for token in normalized.split() if token.isdigit() or token in _SEQUEL_LETTERS)
+
+
+def trigrams(text: str) -> set:
+    """字符三元组集合(首尾补空格,使短名称也有足够的三元组)"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a: set, b: set) -> float:
+    """Dice相似度"""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class TitleIndex:
+    """游戏名称倒排索引"""
+
+    def __init__(self, entries: Iterable[Tuple[Any, str]] = ()):
+        self.exact: Dict[str, List[Any]] = {}
+        self.postings: Dict[str, List[int]] = {}
+        self.grams: List[set] = []
+        self.numbers: List[Tuple[str, ...]] = []
+        self.ids: List[Any] = []
+        for entry_id, title in entries:
+            self.add(entry_id, title)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, entry_id: Any, title: str):
+        """加入一个目录条目"""
+        normalized = normalize_title(title)
+        if not normalized:
+            return
+        position = len(self.ids)
+        grams = trigrams(normalized)
+        self.ids.append(entry_id)
+        self.grams.append(grams)
+        self.numbers.append(sequel_numbers(normalized))
+        self.exact.setdefault(normalized, []).append(entry_id)
+        for gram in grams:
+            self.postings.setdefault(gram, []).append(position)
+
+    def match(self, title: str, threshold: float = DEFAULT_THRESHOLD,
+              candidates: int = DEFAULT_CANDIDATES) -> Optional[Tuple[Any, float]]:
+        """
+        查找最匹配的目录条目
+
+        Args:
+            title: 待匹配的名称
+            threshold: 最低相似度
+            candidates: 精确打分的最大候选数(续作编号不一致的条目直接跳过,不计入)
+
+        Returns:
+            (条目ID, 相似度),没有达到阈值的条目时返回None
+        """
+        normalized = normalize_title(title)
+        if not normalized:
+            return None
+        if normalized in self.exact:
+            return self.exact[normalized][0], 1.0
+
+        grams = trigrams(normalized)
+        numbers = sequel_numbers(normalized)
+        limit = max(MIN_PRUNED_POSTINGS, int(len(self.ids) * MAX_DOCUMENT_FREQUENCY))
+        selective = [g for g in grams if g in self.postings and len(self.postings[g]) <= limit]
+        if not selective:
+            # 名称中只有常见三元组时退回使用全部三元组
+            selective = [g for g in grams if g in self.postings]
+
+        # 按共同三元组数排序候选,只对前几个精确打分
+        counts = Counter()
+        for gram in selective:
+            counts.update(self.postings[gram])
+        if not counts:
+            return None
+
+        best = None
+        scored = 0
+        for position, _ in counts.most_common():
+            if self.numbers[position] != numbers:
+                continue
+            score = dice(grams, self.grams[position])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (self.ids[position], score)
+            scored += 1
+            if scored >= candidates:
+                break
+        return best
+
+    def match_many(self, titles: Iterable[str], threshold: float = DEFAULT_THRESHOLD,
+                   candidates: int = DEFAULT_CANDIDATES) -> List[Optional[Tuple[Any, float]]]:
+        """
+        批量匹配,相同的规范化名称只计算一次
+
+        Returns:
+            与输入顺序一致的匹配结果列表
+        """
+        cache = {}
+        results = []
+        for title in titles:
+            key = normalize_title(title)
+            if key not in cache:
+                cache[key] = self.match(title, threshold, candidates)
+            results.append(cache[key])
+        return results
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='跨平台游戏标题匹配')
+    parser.add_argument('--catalog', required=True, help='目录JSON文件: [{"id": ..., "name": ...}, ...]')
+    parser.add_argument('--titles', help='待匹配的名称JSON文件: ["name", ...](默认读取stdin)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'最低相似度(默认{DEFAULT_THRESHOLD})')
+
+    args = parser.parse_args()
+
+    with open(args.catalog, 'r', encoding='utf-8') as f:
+        index = TitleIndex((item["id"], item["name"]) for item in json.load(f))
+    if args.titles:
+        with open(args.titles, 'r', encoding='utf-8') as f:
+            titles = json.load(f)
+    else:
+        titles = json.load(sys.stdin)
+
+    matches = index.match_many(titles, args.threshold)
+    print(json.dumps([
+        {"title": title, "id": match[0] if match else None, "score": round(match[1], 3) if match else 0.0}
+        for title, match in zip(titles, matches)
+    ], ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,17 @@ Xbox Web API 数据获取脚本（服务器部署版本）
 import asyncio
 import json
 import os
+import re
 import sys
+import time
 from datetime import datetime
 
 try:
     from xbox.webapi.api.client import XboxLiveClient
+    from xbox.webapi.api.provider.titlehub import TitlehubProvider
+    from xbox.webapi.api.provider.titlehub.models import TitleFields, TitleHubResponse
+    from xbox.webapi.api.provider.userstats import UserStatsProvider
+    from xbox.webapi.api.provider.userstats.models import GeneralStatsField, UserStatsResponse
     from xbox.webapi.authentication.manager import AuthenticationManager
     from xbox.webapi.authentication.models import OAuth2TokenResponse
     from xbox.webapi.common.signed_session import SignedSession
@@ -22,17 +28,74 @@ except ImportError:
     }, ensure_ascii=False))
     sys.exit(1)
 
+from achievement_cache import AchievementCache
+from asset_cache import AssetCache, DEFAULT_BASE_URL
+from catalog_cache import CatalogCache, DEFAULT_CACHE_DIR
+from checkpoint_journal import CheckpointJournal, journal_path
+from deadline import Deadline
+from http_retry import RetryPolicy, call_with_retry
+from progress_events import ProgressReporter, ProgressSink, result_status
+from result_output import write_result
+from snapshot_diff import SnapshotDiff
+from snapshot_store import SnapshotStore
+
+# 游戏历史接口的请求头（与 xbox-webapi 的 TitlehubProvider 相同，另加 Accept-Language）
+TITLEHUB_HEADERS = {
+    "x-xbl-contract-version": "2",
+    "x-xbl-client-name": "XboxApp",
+    "x-xbl-client-type": "UWA",
+    "x-xbl-client-version": "39.39.22001.0",
+}
+
+_ISO_TIME = re.compile(r"^(.*T\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:\d{2})?$")
+
+
+def iso_timestamp(value):
+    """
+    将接口返回的时间字符串规范为 datetime.isoformat() 的格式
+
+    小数秒截断为6位（全为0时省略），Z 写作 +00:00，与经过模型解析后的输出一致
+    """
+    if not isinstance(value, str):
+        return value
+    match = _ISO_TIME.match(value)
+    if not match:
+        return value
+    base, fraction, zone = match.groups()
+    fraction = (fraction or "")[:6].ljust(6, "0")
+    if zone == "Z":
+        zone = "+00:00"
+    return base + ("." + fraction if int(fraction) else "") + (zone or "")
+
 
 class XboxDataCollector:
     """Xbox 数据收集器类"""
 
-    def __init__(self, tokens_file):
+    def __init__(self, tokens_file, cache_dir=None, achievement_details=True, achievement_concurrency=8,
+                 deadline=None, progress=None, retries=3, strict=False):
         self.tokens_file = tokens_file
         self.client_id = CLIENT_ID
         self.client_secret = CLIENT_SECRET
         self.auth_mgr = None
         self.xbl_client = None
         self.session = None
+        # 游戏详情、图片等目录元数据跨用户共享缓存
+        self.catalog = CatalogCache(cache_dir) if cache_dir else None
+        # 成就定义按游戏跨用户共享缓存，用户解锁状态单独保存
+        self.achievement_cache = AchievementCache(cache_dir) if cache_dir else None
+        self.achievement_details = achievement_details
+        self.achievement_concurrency = achievement_concurrency
+        # 截止时间：临近时不再开始新的请求，未完成的游戏记录在 pending_titles 中
+        self.deadline = deadline or Deadline(None)
+        self.pending_titles = []
+        # 游戏时间和成就明细请求失败时按指数退避重试，遵守 Retry-After
+        self.retry_policy = RetryPolicy(retries, deadline=self.deadline)
+        # 严格模式：用 xbox-webapi 的模型校验游戏历史和游戏时间响应；默认直接解析原始JSON
+        self.strict = strict
+        # 进度报告：按阶段输出已完成数量和预计剩余时间
+        self.progress = progress or ProgressReporter("xbox")
+        # 断点日志：逐个游戏记录游戏时间和成就明细，认证后按用户创建
+        self.journal = None
 
     async def authenticate(self, session):
         """进行身份认证"""
@@ -176,134 +239,407 @@ class XboxDataCollector:
         except Exception as e:
             return {"error": str(e)}
 
+    @staticmethod
+    def _detail_from_raw(detail):
+        """将接口返回的游戏详情转换为输出格式"""
+        return {
+            "description": detail.get("description"),
+            "short_description": detail.get("shortDescription"),
+            "developer_name": detail.get("developerName"),
+            "publisher_name": detail.get("publisherName"),
+            "release_date": iso_timestamp(detail.get("releaseDate")),
+            "min_age": detail.get("minAge"),
+            "genres": detail.get("genres"),
+            "xbox_live_gold_required": detail.get("xboxLiveGoldRequired"),
+            "capabilities": detail.get("capabilities"),
+        }
+
+    @classmethod
+    def _title_from_raw(cls, title):
+        """将接口返回的单个游戏直接转换为输出格式"""
+        achievement = title.get("achievement")
+        history = title.get("titleHistory")
+        game_pass = title.get("gamePass")
+        images = title.get("images")
+        return {
+            "title_id": title.get("titleId"),
+            "name": title.get("name"),
+            "type": title.get("type"),
+            "devices": title.get("devices"),
+            "display_image": title.get("displayImage"),
+            "service_config_id": title.get("serviceConfigId"),
+            "modern_title_id": title.get("modernTitleId"),
+            "pfn": title.get("pfn"),
+            "is_bundle": title.get("isBundle"),
+            "achievement": {
+                "current_achievements": achievement.get("currentAchievements"),
+                "total_achievements": achievement.get("totalAchievements"),
+                "current_gamerscore": achievement.get("currentGamerscore"),
+                "total_gamerscore": achievement.get("totalGamerscore"),
+                "progress_percentage": achievement.get("progressPercentage"),
+                "source_version": achievement.get("sourceVersion"),
+            } if achievement else None,
+            "title_history": {
+                "last_time_played": iso_timestamp(history.get("lastTimePlayed")),
+                "visible": history.get("visible"),
+                "can_hide": history.get("canHide"),
+            } if history else None,
+            "detail": cls._detail_from_raw(title["detail"]) if title.get("detail") else None,
+            "game_pass": {"is_game_pass": game_pass.get("isGamePass")} if game_pass else None,
+            "stats": None,
+            "images": [{"url": img.get("url"), "type": img.get("type")} for img in images] if images else None,
+            "game_time_minutes": None,
+            "achievements": None,
+        }
+
+    async def _get_json(self, url, headers, params=None):
+        """通过已认证的会话请求接口，直接返回解析后的JSON"""
+        response = await self.xbl_client.session.get(url, params=params, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def _get_title_history_raw(self, target_xuid, fields, max_items):
+        """请求游戏历史并转换为输出格式，不经过 xbox-webapi 的模型（严格模式下仍用模型校验）"""
+        url = (
+            f"{TitlehubProvider.TITLEHUB_URL}/users/xuid({target_xuid})/titles/titlehistory/decoration/"
+            f"{','.join(field.value for field in fields)}"
+        )
+        headers = dict(TITLEHUB_HEADERS, **{"Accept-Language": self.xbl_client.language.locale})
+        data = await self._get_json(url, headers, {"maxItems": max_items})
+        if self.strict:
+            TitleHubResponse(**data)
+        return [self._title_from_raw(title) for title in data.get("titles") or []]
+
+    async def _get_minutes_played(self, target_xuid, service_config_id):
+        """请求单个游戏的游戏时间（分钟），不经过 xbox-webapi 的模型（严格模式下仍用模型校验）"""
+        url = (
+            f"{UserStatsProvider.USERSTATS_URL}/users/xuid({target_xuid})/scids/{service_config_id}"
+            f"/stats/{GeneralStatsField.MINUTES_PLAYED}"
+        )
+        data = await self._get_json(url, UserStatsProvider.HEADERS_USERSTATS)
+        if self.strict:
+            UserStatsResponse(**data)
+        for statlist in data.get("statlistscollection") or []:
+            for stat in statlist.get("stats") or []:
+                if stat.get("scid") == service_config_id and stat.get("name") == "MinutesPlayed":
+                    try:
+                        return int(stat.get("value"))
+                    except (ValueError, TypeError):
+                        return stat.get("value")
+        return None
+
+    async def _fetch_title_history(self, target_xuid, max_items):
+        """
+        获取游戏历史,并用目录缓存补全详情和图片
+
+        缓存可用时先请求不含详情和图片的精简历史；只有存在未缓存的游戏时
+        才请求完整历史并写入缓存。
+
+        Returns:
+            (输出格式的游戏列表, {title_id: 缓存的目录元数据})
+        """
+        base_fields = [
+            TitleFields.ACHIEVEMENT,
+            TitleFields.SERVICE_CONFIG_ID,
+            TitleFields.STATS,
+            TitleFields.GAME_PASS,
+        ]
+        full_fields = base_fields + [TitleFields.IMAGE, TitleFields.DETAIL]
+
+        if self.catalog:
+            titles = await self._get_title_history_raw(target_xuid, base_fields, max_items)
+            title_ids = [title["title_id"] for title in titles]
+            cached = self.catalog.get_many("xbox", title_ids)
+            if len(cached) == len(set(title_ids)):
+                return titles, cached
+
+        titles = await self._get_title_history_raw(target_xuid, full_fields, max_items)
+
+        if self.catalog:
+            self.catalog.put_many("xbox", {
+                title["title_id"]: {"detail": title["detail"], "images": title["images"]}
+                for title in titles
+            })
+        return titles, {}
+
+    @staticmethod
+    def _split_achievement(achievement):
+        """将单个成就拆分为共享的成就定义和用户解锁状态"""
+        icon = next(
+            (asset.url for asset in achievement.media_assets if asset.type == "Icon"), None
+        )
+        gamerscore = next(
+            (reward.value for reward in achievement.rewards if reward.type == "Gamerscore"), None
+        )
+        definition = {
+            "id": achievement.id,
+            "name": achievement.name,
+            "description": achievement.description,
+            "locked_description": achievement.locked_description,
+            "is_secret": achievement.is_secret,
+            "icon": icon,
+            "gamerscore": int(gamerscore) if gamerscore and gamerscore.isdigit() else 0,
+            "achievement_type": achievement.achievement_type,
+            "platforms": achievement.platforms,
+        }
+        unlocked = achievement.progress_state == "Achieved"
+        unlock = {
+            "progress_state": achievement.progress_state,
+            "time_unlocked": (
+                achievement.progression.time_unlocked.isoformat() if unlocked else None
+            ),
+        }
+        return definition, unlock
+
+    async def _fetch_title_achievements(self, target_xuid, title_id, semaphore):
+        """获取单个游戏的完整成就列表，返回(成就定义, 解锁状态)，临近截止时间返回None"""
+        async with semaphore:
+            if not self.deadline.can_start():
+                return None
+            started = time.monotonic()
+            response = await call_with_retry(
+                lambda: self.xbl_client.achievements.get_achievements_xboxone_gameprogress(
+                    target_xuid, title_id
+                ),
+                self.retry_policy
+            )
+            self.deadline.record(time.monotonic() - started)
+        definitions, unlocks = [], {}
+        for achievement in response.achievements:
+            definition, unlock = self._split_achievement(achievement)
+            definitions.append(definition)
+            unlocks[definition["id"]] = unlock
+        return {"achievements": definitions}, unlocks
+
+    async def collect_achievement_details(self, target_xuid, titles):
+        """
+        并发获取每个游戏的成就明细
+
+        只有成就统计与上次运行不同、或共享成就定义已过期的游戏才会请求接口，
+        其余游戏直接使用缓存的成就定义和上次保存的解锁状态。
+
+        Args:
+            target_xuid: 用户xuid
+            titles: get_title_history输出的游戏列表，结果写入每个游戏的 achievements 字段
+        """
+        cache = self.achievement_cache
+        previous = cache.load_unlocks("xbox", target_xuid) if cache else {}
+        resumed = self.journal.completed("achievements") if self.journal else {}
+        semaphore = asyncio.Semaphore(self.achievement_concurrency)
+        pending = []
+
+        for title_info in titles:
+            summary = title_info.get("achievement")
+            if not summary or not summary.get("total_achievements"):
+                continue
+            title_id = str(title_info["title_id"])
+            counts = {
+                "current_achievements": summary.get("current_achievements"),
+                "total_achievements": summary.get("total_achievements"),
+                "current_gamerscore": summary.get("current_gamerscore"),
+            }
+            definitions = cache.get_definitions("xbox", title_id) if cache else None
+            last = previous.get(title_id)
+            if definitions is not None and last and last.get("summary") == counts:
+                title_info["achievements"] = self._merge_achievements(definitions, last["unlocks"])
+            elif resumed.get(title_id) and resumed[title_id]["summary"] == counts:
+                # 断点日志中已有该游戏的成就明细
+                entry = resumed[title_id]
+                self._store_achievements(
+                    target_xuid, title_info, title_id, counts, entry["definitions"], entry["unlocks"]
+                )
+            else:
+                pending.append((title_info, title_id, counts))
+
+        async def fetch(title_info, title_id, counts):
+            try:
+                fetched = await self._fetch_title_achievements(target_xuid, title_id, semaphore)
+            except Exception as e:
+                title_info["achievements_error"] = str(e)
+                if self.journal:
+                    self.journal.fail(title_id, "achievements", str(e))
+                return
+            finally:
+                self.progress.advance()
+            if fetched is None:
+                self.pending_titles.append(title_id)
+                return
+            definitions, unlocks = fetched
+            if self.journal:
+                self.journal.record(title_id, "achievements",
+                                    {"summary": counts, "definitions": definitions, "unlocks": unlocks})
+            self._store_achievements(target_xuid, title_info, title_id, counts, definitions, unlocks)
+
+        self.progress.phase("achievements", len(pending))
+        await asyncio.gather(*(fetch(*item) for item in pending))
+        if cache:
+            cache.save_unlocks("xbox", target_xuid)
+
+    def _store_achievements(self, target_xuid, title_info, title_id, counts, definitions, unlocks):
+        """写入共享成就缓存并合并到游戏记录"""
+        cache = self.achievement_cache
+        if cache:
+            cache.put_definitions("xbox", title_id, definitions)
+            cache.set_unlocks(
+                "xbox", target_xuid, title_id, {"summary": counts, "unlocks": unlocks}
+            )
+        title_info["achievements"] = self._merge_achievements(definitions, unlocks)
+
+    @staticmethod
+    def _merge_achievements(definitions, unlocks):
+        """合并成就定义和解锁状态"""
+        return [
+            dict(definition, **unlocks.get(definition["id"], {"progress_state": None, "time_unlocked": None}))
+            for definition in definitions.get("achievements", [])
+        ]
+
+    @staticmethod
+    def prioritize_titles(titles):
+        """
+        按最近游玩时间倒序排列游戏，使截止时间内优先获取最近玩过的游戏的游戏时间和成就
+
+        没有游玩记录的游戏排在最后，时间相同的保持接口原有顺序；
+        接口返回的时间均为UTC且格式一致，直接按字符串比较
+        """
+        def last_played(title):
+            return (title.get("title_history") or {}).get("last_time_played") or ""
+
+        return sorted(titles, key=last_played, reverse=True)
+
     async def get_title_history(self, xuid=None, max_items=50):
         """获取游戏活动历史"""
         try:
-            from xbox.webapi.api.provider.titlehub.models import TitleFields
-
             target_xuid = xuid or self.xbl_client.xuid
 
-            fields = [
-                TitleFields.ACHIEVEMENT,
-                TitleFields.IMAGE,
-                TitleFields.SERVICE_CONFIG_ID,
-                TitleFields.DETAIL,
-                TitleFields.STATS,
-                TitleFields.GAME_PASS,
-            ]
-
-            title_history = await self.xbl_client.titlehub.get_title_history(
-                target_xuid, max_items=max_items, fields=fields
-            )
+            titles, cached = await self._fetch_title_history(target_xuid, max_items)
 
             titles_data = {
                 "xuid": target_xuid,
                 "titles": [],
             }
-
-            if title_history.titles:
-                for title in title_history.titles:
-                    title_info = {
-                        "title_id": title.title_id,
-                        "name": title.name,
-                        "type": title.type,
-                        "devices": title.devices,
-                        "display_image": title.display_image,
-                        "service_config_id": title.service_config_id,
-                        "modern_title_id": title.modern_title_id,
-                        "pfn": title.pfn,
-                        "is_bundle": title.is_bundle,
-                        "achievement": None,
-                        "title_history": None,
-                        "detail": None,
-                        "game_pass": None,
-                        "stats": None,
-                        "images": None,
-                        "game_time_minutes": None,
-                    }
-
-                    if title.title_history:
-                        title_info["title_history"] = {
-                            "last_time_played": (
-                                title.title_history.last_time_played.isoformat()
-                                if hasattr(title.title_history.last_time_played, "isoformat")
-                                else str(title.title_history.last_time_played)
-                            ),
-                            "visible": title.title_history.visible,
-                            "can_hide": title.title_history.can_hide,
-                        }
-
-                    if title.achievement:
-                        title_info["achievement"] = {
-                            "current_achievements": title.achievement.current_achievements,
-                            "total_achievements": title.achievement.total_achievements,
-                            "current_gamerscore": title.achievement.current_gamerscore,
-                            "total_gamerscore": title.achievement.total_gamerscore,
-                            "progress_percentage": title.achievement.progress_percentage,
-                            "source_version": title.achievement.source_version,
-                        }
-
-                    if title.detail:
-                        title_info["detail"] = {
-                            "description": title.detail.description,
-                            "short_description": title.detail.short_description,
-                            "developer_name": title.detail.developer_name,
-                            "publisher_name": title.detail.publisher_name,
-                            "release_date": (
-                                title.detail.release_date.isoformat()
-                                if title.detail.release_date
-                                and hasattr(title.detail.release_date, "isoformat")
-                                else str(title.detail.release_date) if title.detail.release_date else None
-                            ),
-                            "min_age": title.detail.min_age,
-                            "genres": title.detail.genres,
-                            "xbox_live_gold_required": title.detail.xbox_live_gold_required,
-                            "capabilities": title.detail.capabilities,
-                        }
-
-                    if title.game_pass:
-                        title_info["game_pass"] = {
-                            "is_game_pass": title.game_pass.is_game_pass,
-                        }
-
-                    if title.images:
-                        title_info["images"] = [
-                            {"url": img.url, "type": img.type} for img in title.images
-                        ]
-
-                    # 获取游戏时间
-                    if title.service_config_id:
+            resumed = self.journal.completed("stats") if self.journal else {}
+
+            if titles:
+                self.progress.phase("titles", len(titles))
+                for title_info in self.prioritize_titles(titles):
+                    title_id = str(title_info["title_id"])
+                    service_config_id = title_info["service_config_id"]
+
+                    if title_id in cached:
+                        title_info["detail"] = title_info["detail"] or cached[title_id]["detail"]
+                        title_info["images"] = title_info["images"] or cached[title_id]["images"]
+
+                    # 获取游戏时间（断点日志中已有的直接使用）
+                    requested = False
+                    if service_config_id and title_id in resumed:
+                        title_info["game_time_minutes"] = resumed[title_id]
+                    elif service_config_id and not self.deadline.can_start():
+                        self.pending_titles.append(title_id)
+                    elif service_config_id:
+                        requested = True
+                        started = time.monotonic()
                         try:
-                            from xbox.webapi.api.provider.userstats.models import GeneralStatsField
-
-                            stats = await self.xbl_client.userstats.get_stats(
-                                target_xuid,
-                                title.service_config_id,
-                                stats_fields=[GeneralStatsField.MINUTES_PLAYED],
+                            title_info["game_time_minutes"] = await call_with_retry(
+                                lambda: self._get_minutes_played(target_xuid, service_config_id),
+                                self.retry_policy
+                            )
+                            if self.journal:
+                                self.journal.record(title_id, "stats", title_info["game_time_minutes"])
+                        except Exception as e:
+                            print(
+                                f"WARNING: 获取游戏时间失败 {title_id}: {e}",
+                                file=sys.stderr, flush=True
                             )
-                            if stats.statlistscollection:
-                                for statlist in stats.statlistscollection:
-                                    for stat in statlist.stats:
-                                        if (
-                                            stat.scid == title.service_config_id
-                                            and stat.name == "MinutesPlayed"
-                                        ):
-                                            try:
-                                                title_info["game_time_minutes"] = int(stat.value)
-                                            except (ValueError, TypeError):
-                                                title_info["game_time_minutes"] = stat.value
-                                            break
-                                    if title_info.get("game_time_minutes") is not None:
-                                        break
-                        except Exception:
-                            pass
+                            if self.journal:
+                                self.journal.fail(title_id, "stats", str(e))
+                        self.deadline.record(time.monotonic() - started)
 
                     titles_data["titles"].append(title_info)
+                    # 只有实际请求的游戏计入吞吐量，断点恢复和无需请求的游戏不影响剩余时间估计
+                    self.progress.advance(measured=requested)
+
+            if self.achievement_details:
+                await self.collect_achievement_details(target_xuid, titles_data["titles"])
+
+            if self.pending_titles:
+                titles_data["pending_titles"] = list(dict.fromkeys(self.pending_titles))
+                print(
+                    f"INFO: 接近截止时间，{len(titles_data['pending_titles'])} 个游戏未完整获取",
+                    file=sys.stderr, flush=True
+                )
 
             return titles_data
         except Exception as e:
             return {"error": str(e)}
 
+    @staticmethod
+    def presence_summary(presence_data):
+        """提取在线状态中用于比较的字段（忽略时间戳等每次都会变化的字段）"""
+        titles = []
+        for device in presence_data.get("devices") or []:
+            for title in device.get("titles") or []:
+                rich_presence = [a.get("rich_presence") for a in title.get("activity") or []]
+                titles.append({
+                    "device": device.get("type"),
+                    "id": title.get("id"),
+                    "name": title.get("name"),
+                    "state": title.get("state"),
+                    "placement": title.get("placement"),
+                    "rich_presence": rich_presence,
+                })
+        titles.sort(key=lambda t: (t["device"] or "", t["id"] or ""))
+        return {"state": presence_data.get("state"), "titles": titles}
+
+    async def watch_presence(self, min_interval=15, max_interval=300, emit=None):
+        """
+        持续轮询在线状态，只在状态变化时输出事件
+
+        用户在线时按最小间隔轮询；离线或状态长时间不变时间隔逐步加倍，
+        直到最大间隔；检测到变化后恢复最小间隔。
+
+        Args:
+            min_interval: 最小轮询间隔（秒）
+            max_interval: 最大轮询间隔（秒）
+            emit: 事件回调，默认以NDJSON输出到stdout
+        """
+        if emit is None:
+            def emit(event):
+                print(json.dumps(event, ensure_ascii=False), flush=True)
+
+        last = None
+        interval = min_interval
+        while True:
+            presence = await self.get_own_presence()
+
+            if "error" in presence:
+                # 长时间运行时令牌可能过期，刷新后重试
+                emit({"event": "error", "time": datetime.now().isoformat(), "message": presence["error"]})
+                try:
+                    await self.auth_mgr.refresh_tokens()
+                    with open(self.tokens_file, mode="w", encoding="utf-8") as f:
+                        f.write(self.auth_mgr.oauth.json())
+                except Exception:
+                    pass
+                interval = min(interval * 2, max_interval)
+            else:
+                current = self.presence_summary(presence)
+                if current != last:
+                    emit({
+                        "event": "presence" if last is None else "presence_changed",
+                        "time": datetime.now().isoformat(),
+                        "previous": last,
+                        "current": current,
+                        "presence": presence,
+                    })
+                    last = current
+                    interval = min_interval
+                elif current["state"] != "Online":
+                    interval = min(interval * 2, max_interval)
+                else:
+                    interval = min(interval * 1.5, max(min_interval, max_interval / 4))
+
+            await asyncio.sleep(interval)
+
     async def collect_all_data(self):
         """收集所有数据"""
         all_data = {
@@ -313,9 +649,148 @@ class XboxDataCollector:
             "presence": await self.get_own_presence(),
             "title_history": await self.get_title_history(),
         }
+        if all_data["title_history"].get("pending_titles"):
+            all_data["partial"] = True
         return all_data
 
 
+async def collect(tokens_file, cache_dir, use_cache=True, deadline=None,
+                  achievement_details=True, achievement_concurrency=8, progress=None,
+                  resume=False, journal_file=None, retries=3, strict=False):
+    """
+    完整采集一次
+
+    Args:
+        tokens_file: 令牌文件路径
+        cache_dir: 共享缓存目录
+        use_cache: 是否使用目录和成就缓存
+        deadline: 截止时间
+        achievement_details: 是否获取每个游戏的成就明细
+        achievement_concurrency: 并发获取成就明细的游戏数
+        progress: 进度报告，为None时不输出进度
+        resume: 是否从断点日志恢复已完成的游戏时间和成就明细
+        journal_file: 断点日志路径，默认为 state/journal/xbox_{user_id}.ndjson
+        retries: 游戏时间和成就明细请求失败后最多重试次数
+        strict: 是否用 xbox-webapi 的模型校验游戏历史和游戏时间响应
+
+    Returns:
+        (采集结果, 快照键)，认证失败时结果为认证错误、快照键为None
+    """
+    async with SignedSession() as session:
+        collector = XboxDataCollector(
+            tokens_file=tokens_file,
+            cache_dir=cache_dir if use_cache else None,
+            achievement_details=achievement_details,
+            achievement_concurrency=achievement_concurrency,
+            deadline=deadline,
+            progress=progress,
+            retries=retries,
+            strict=strict
+        )
+
+        # 认证
+        auth_result = await collector.authenticate(session)
+        if not auth_result.get("success"):
+            return auth_result, None
+
+        user_id = collector.auth_mgr.oauth.user_id
+        collector.journal = CheckpointJournal(journal_file or journal_path(cache_dir, "xbox", user_id), resume)
+
+        # 收集数据
+        data = await collector.collect_all_data()
+        data["success"] = True
+
+        failed = collector.journal.summary()
+        if failed:
+            data["failed_titles"] = failed
+            print(
+                f"INFO: {sum(map(len, failed.values()))} 项获取失败，使用 --resume 重新运行时只重试失败和未获取的项目",
+                file=sys.stderr, flush=True
+            )
+        collector.journal.close(complete=not data.get("partial"))
+        if collector.retry_policy.retried:
+            print(f"INFO: 请求重试 {collector.retry_policy.retried} 次", file=sys.stderr, flush=True)
+        return data, user_id
+
+
+def read_token_user_id(tokens_file):
+    """不访问网络，直接从令牌文件读取用户ID（用作快照键）"""
+    try:
+        with open(tokens_file, "r", encoding="utf-8") as f:
+            return json.load(f).get("user_id")
+    except (OSError, ValueError):
+        return None
+
+
+def read_snapshot(store, max_age, title_id=None):
+    """
+    从本地快照读取数据，不访问网络
+
+    Args:
+        store: 用户快照存储
+        max_age: 最大允许的快照时长（秒）
+        title_id: 只读取指定游戏，为None时读取全部游戏
+
+    Returns:
+        与完整采集相同格式的结果，快照不存在或已过期返回None
+    """
+    snapshot = store.open(max_age)
+    if not snapshot:
+        return None
+
+    with snapshot:
+        data = dict(snapshot.meta)
+        if title_id is not None:
+            title = snapshot.get(title_id)
+            titles = [title] if title else []
+        else:
+            titles = list(snapshot.records())
+        data["title_history"] = dict(data.get("title_history") or {}, titles=titles)
+        data["from_snapshot"] = True
+        data["snapshot_age"] = int(snapshot.age())
+    return data
+
+
+def localize_images(data, asset_cache):
+    """
+    将结果中的头像和游戏图片下载到本地缓存，并改写为本地地址
+
+    Args:
+        data: collect_all_data的结果
+        asset_cache: 图片缓存
+    """
+    targets = []
+    profile = data.get("profile") or {}
+    if isinstance(profile.get("display_pic"), str):
+        targets.append((profile, "display_pic"))
+    for title in (data.get("title_history") or {}).get("titles") or []:
+        if isinstance(title.get("display_image"), str):
+            targets.append((title, "display_image"))
+        for image in title.get("images") or []:
+            if isinstance(image.get("url"), str):
+                targets.append((image, "url"))
+
+    assets = asset_cache.localize(container[key] for container, key in targets)
+    for container, key in targets:
+        if container[key] in assets:
+            container[key] = assets[container[key]]["url"]
+    data["assets"] = assets
+
+
+def save_snapshot(store, data):
+    """将采集结果保存为快照，游戏历史按title_id建立索引"""
+    title_history = data.get("title_history") or {}
+    if "titles" not in title_history:
+        return
+    meta = dict(data)
+    meta["title_history"] = {k: v for k, v in title_history.items() if k != "titles"}
+    # 未完整获取的游戏沿用上一个快照中的记录
+    store.save(
+        meta, title_history["titles"], "title_id",
+        keep_previous=title_history.get("pending_titles")
+    )
+
+
 async def main():
     """主函数"""
     import argparse
@@ -330,36 +805,179 @@ async def main():
     parser.add_argument(
         "--output",
         "-o",
-        help="输出文件路径（可选，不指定则输出到stdout）"
+        help="输出文件路径（原子写入，stdout只输出一行状态；不指定则输出到stdout）"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="共享缓存目录（默认: Backend/Cache）"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="不使用本地共享缓存"
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="只输出与上次运行相比新增、删除和变更的游戏"
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        help="读取模式：本地快照未超过指定秒数时直接返回快照数据"
+    )
+    parser.add_argument(
+        "--title-id",
+        help="只返回指定游戏的数据"
+    )
+    parser.add_argument(
+        "--no-achievement-details",
+        action="store_true",
+        help="不获取每个游戏的成就明细，只保留成就统计"
+    )
+    parser.add_argument(
+        "--achievement-concurrency",
+        type=int,
+        default=8,
+        help="并发获取成就明细的游戏数（默认8）"
+    )
+    parser.add_argument(
+        "--assets",
+        action="store_true",
+        help="下载头像和游戏图片到本地缓存并改写为本地地址"
+    )
+    parser.add_argument(
+        "--asset-base-url",
+        default=DEFAULT_BASE_URL,
+        help="本地图片的访问路径前缀（默认: /assets）"
+    )
+    parser.add_argument(
+        "--watch-presence",
+        action="store_true",
+        help="持续监视在线状态，以NDJSON输出状态变化事件"
+    )
+    parser.add_argument(
+        "--presence-min-interval",
+        type=float,
+        default=15,
+        help="在线状态最小轮询间隔（秒，默认15）"
+    )
+    parser.add_argument(
+        "--presence-max-interval",
+        type=float,
+        default=300,
+        help="在线状态最大轮询间隔（秒，默认300）"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help="运行时长上限（秒），临近时输出部分结果并列出未完整获取的游戏"
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="以 \"PROGRESS: {json}\" 行向stderr输出进度事件"
+    )
+    parser.add_argument(
+        "--progress-file",
+        help="把最新的进度事件原子写入该文件，供后端轮询"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="游戏时间和成就明细请求失败后最多重试次数（默认3，指数退避并遵守Retry-After）"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="从断点日志恢复：跳过上次已完成的游戏，只重试失败和未获取的项目"
+    )
+    parser.add_argument(
+        "--journal",
+        help="断点日志路径（默认: Cache/state/journal/xbox_{user_id}.ndjson）"
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="用 xbox-webapi 的模型校验游戏历史和游戏时间响应（较慢，用于排查接口变化）"
     )
     args = parser.parse_args()
+    if args.diff and args.title_id is not None:
+        parser.error("--diff 需要完整游戏列表，不能与 --title-id 同时使用")
+
+    if args.watch_presence:
+        async with SignedSession() as session:
+            collector = XboxDataCollector(tokens_file=args.tokens)
+            auth_result = await collector.authenticate(session)
+            if not auth_result.get("success"):
+                print(json.dumps(auth_result), flush=True)
+                sys.exit(1)
+            await collector.watch_presence(args.presence_min_interval, args.presence_max_interval)
+        return
+
+    data = None
+
+    # 读取模式：快照足够新时不访问网络
+    snapshot_key = read_token_user_id(args.tokens)
+    if args.max_age is not None and snapshot_key:
+        data = read_snapshot(
+            SnapshotStore(args.cache_dir, "xbox", snapshot_key), args.max_age, args.title_id
+        )
 
-    async with SignedSession() as session:
-        collector = XboxDataCollector(tokens_file=args.tokens)
-
-        # 认证
-        auth_result = await collector.authenticate(session)
-        if not auth_result.get("success"):
-            print(json.dumps(auth_result), flush=True)
+    if data is None:
+        deadline = Deadline(args.deadline)
+        progress = ProgressReporter("xbox", ProgressSink(args.progress_file, args.progress))
+        data, snapshot_key = await collect(
+            args.tokens, args.cache_dir, not args.no_cache, deadline,
+            achievement_details=not args.no_achievement_details,
+            achievement_concurrency=args.achievement_concurrency,
+            progress=progress,
+            resume=args.resume,
+            journal_file=args.journal,
+            retries=args.retries,
+            strict=args.strict
+        )
+        if snapshot_key is None:
+            progress.finish("failed")
+            print(json.dumps(data), flush=True)
             sys.exit(1)
 
-        # 收集数据
-        data = await collector.collect_all_data()
-        data["success"] = True
+        if args.assets and deadline.expired():
+            print("INFO: 接近截止时间，跳过图片本地化", file=sys.stderr, flush=True)
+        elif args.assets:
+            progress.phase("assets")
+            asset_cache = AssetCache(args.cache_dir, args.asset_base_url)
+            await asyncio.get_running_loop().run_in_executor(None, localize_images, data, asset_cache)
+
+        # 保存快照供后续读取
+        save_snapshot(SnapshotStore(args.cache_dir, "xbox", snapshot_key), data)
+        progress.finish(result_status(data))
+
+        title_history = data.get("title_history") or {}
+        if args.title_id is not None and "titles" in title_history:
+            title_history["titles"] = [
+                t for t in title_history["titles"] if t["title_id"] == str(args.title_id)
+            ]
 
-        # 输出数据
-        output_json = json.dumps(data, ensure_ascii=False, indent=2)
-        
-        if args.output:
-            with open(args.output, "w", encoding="utf-8") as f:
-                f.write(output_json)
-        else:
-            print(output_json, flush=True)
+    # 变更检测模式：用差异替换完整游戏列表
+    title_history = data.get("title_history") or {}
+    if args.diff and "titles" in title_history:
+        differ = SnapshotDiff(args.cache_dir, "xbox", str(data["xuid"]))
+        title_history["diff"] = differ.diff(
+            title_history.pop("titles"), "title_id", skip=title_history.get("pending_titles")
+        )
+
+    # 输出数据
+    write_result(data, args.output)
 
 
 if __name__ == "__main__":
     try:
         asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
     except Exception as e:
         print(json.dumps({
             "success": False,
@@ -1,4 +1,5 @@
 using PlayLinker.Models.DTOs;
+using System.Collections.Concurrent;
 using System.Diagnostics;
 using System.Text.Json;
 
@@ -15,6 +16,18 @@ public class GogService : IGogService
     private readonly string _pythonPath;
     private readonly string _scriptsPath;
     private readonly string _tokensPath;
+    private readonly int _snapshotMaxAgeSeconds;
+    private readonly int _deadlineSeconds;
+    private readonly string _progressDirectory;
+    private readonly string _outputDirectory;
+
+    // 已结束的导入任务结果,按任务ID保存供轮询(服务按请求创建,需跨实例共享)
+    private static readonly ConcurrentDictionary<string, (GogImportResponseDto Result, DateTime FinishedAt)> CompletedImports = new();
+    private static readonly TimeSpan CompletedImportRetention = TimeSpan.FromHours(1);
+
+    // 上一次采集未完成(部分结果或超时)的令牌文件,下一次采集带 --resume 从断点日志继续;
+    // 其余情况不恢复,避免沿用断点日志中的旧记录
+    private static readonly ConcurrentDictionary<string, bool> ResumableTokens = new();
 
     public GogService(IConfiguration configuration, ILogger<GogService> logger, IWebHostEnvironment environment)
     {
@@ -30,6 +43,19 @@ public class GogService : IGogService
         // 令牌路径: Backend/Tokens
         _tokensPath = Path.Combine(environment.ContentRootPath, "Tokens");
 
+        // 查询接口可直接使用的本地快照最大时长(秒)
+        // 默认覆盖 refresh_scheduler.py 对活跃用户的刷新间隔(3600秒,加20%抖动),使查询能用上后台刷新的快照
+        _snapshotMaxAgeSeconds = int.TryParse(configuration["GogAPI:SnapshotMaxAgeSeconds"], out var maxAge) ? maxAge : 4500;
+
+        // 采集脚本自行控制的运行时长(秒),须小于进程超时以便输出部分结果
+        _deadlineSeconds = int.TryParse(configuration["GogAPI:DeadlineSeconds"], out var deadline) ? deadline : 270;
+
+        // 导入任务的进度文件目录(每个任务一个文件,导入进行中可轮询)
+        _progressDirectory = Path.Combine(environment.ContentRootPath, "Cache", "state", "progress");
+
+        // 采集脚本原子写入结果的目录(每次调用使用单独的文件)
+        _outputDirectory = Path.Combine(environment.ContentRootPath, "Cache", "state", "output");
+
         // 确保目录存在
         Directory.CreateDirectory(_scriptsPath);
         Directory.CreateDirectory(_tokensPath);
@@ -158,6 +184,19 @@ public class GogService : IGogService
         return (process.ExitCode, output, error);
     }
 
+    /// <summary>
+    /// 构造快照读取参数(快照足够新时Python脚本不访问网络)
+    /// </summary>
+    private string SnapshotReadArguments(string? gameId = null)
+    {
+        var arguments = $"--max-age {_snapshotMaxAgeSeconds}";
+        if (!string.IsNullOrEmpty(gameId) && gameId.All(char.IsDigit))
+        {
+            arguments += $" --game-id {gameId}";
+        }
+        return arguments;
+    }
+
     /// <summary>
     /// 获取令牌文件路径
     /// </summary>
@@ -177,49 +216,83 @@ public class GogService : IGogService
     {
         try
         {
-            // 测试Python是否可用
-            var startInfo = new ProcessStartInfo
+            // 环境指纹未变化时直接使用上次的检查结果,不启动Python进程
+            if (IsPythonEnvironmentCached("gog"))
             {
-                FileName = _pythonPath,
-                Arguments = "--version",
-                UseShellExecute = false,
-                RedirectStandardOutput = true,
-                RedirectStandardError = true,
-                CreateNoWindow = true
-            };
-
-            using var process = new Process { StartInfo = startInfo };
-            process.Start();
-            var output = await process.StandardOutput.ReadToEndAsync();
-            var error = await process.StandardError.ReadToEndAsync();
-            await process.WaitForExitAsync();
+                return (true, "Python环境正常");
+            }
 
-            if (process.ExitCode != 0)
+            // 一次进程完成版本和依赖检查,成功结果由脚本写入缓存
+            var (exitCode, output, error) = await RunPythonScript("env_check.py", $"--profile gog --command \"{_pythonPath}\"");
+            var jsonLine = output.Split('\n', StringSplitOptions.RemoveEmptyEntries)
+                .LastOrDefault(l => l.Trim().StartsWith("{"));
+            if (string.IsNullOrEmpty(jsonLine))
             {
                 return (false, $"Python执行失败: {error}");
             }
 
-            _logger.LogInformation("Python版本: {Version}", output.Trim());
+            using var result = JsonDocument.Parse(jsonLine);
+            var message = result.RootElement.TryGetProperty("message", out var messageElement)
+                ? messageElement.GetString() ?? ""
+                : "";
+            _logger.LogInformation("Python环境检查: {Message}", message);
+            return (exitCode == 0, message);
+        }
+        catch (Exception ex)
+        {
+            return (false, $"测试Python环境失败: {ex.Message}");
+        }
+    }
 
-            // 测试依赖(requests库)
-            startInfo.Arguments = "-c \"import requests; print('requests已安装')\"";
-            using var depProcess = new Process { StartInfo = startInfo };
-            depProcess.Start();
-            var depOutput = await depProcess.StandardOutput.ReadToEndAsync();
-            var depError = await depProcess.StandardError.ReadToEndAsync();
-            await depProcess.WaitForExitAsync();
+    /// <summary>
+    /// 检查缓存的Python环境指纹(解释器、site-packages修改时间)是否仍然有效
+    /// </summary>
+    private bool IsPythonEnvironmentCached(string profile)
+    {
+        try
+        {
+            var cachePath = Path.Combine(Path.GetDirectoryName(_scriptsPath)!, "Cache", "state", $"python_env_{profile}.json");
+            if (!File.Exists(cachePath))
+            {
+                return false;
+            }
 
-            if (depProcess.ExitCode != 0)
+            using var cached = JsonDocument.Parse(File.ReadAllText(cachePath));
+            var root = cached.RootElement;
+            if (!root.TryGetProperty("success", out var success) || !success.GetBoolean()
+                || !root.TryGetProperty("fingerprint", out var fingerprint)
+                || fingerprint.GetProperty("command").GetString() != _pythonPath)
             {
-                return (false, $"requests库未安装。请执行: pip install requests\n详细错误: {depError}");
+                return false;
             }
 
-            _logger.LogInformation("依赖检查: {Result}", depOutput.Trim());
-            return (true, "Python环境正常");
+            foreach (var entry in fingerprint.GetProperty("paths").EnumerateObject())
+            {
+                DateTime lastWrite;
+                if (Directory.Exists(entry.Name))
+                {
+                    lastWrite = Directory.GetLastWriteTimeUtc(entry.Name);
+                }
+                else if (File.Exists(entry.Name))
+                {
+                    lastWrite = File.GetLastWriteTimeUtc(entry.Name);
+                }
+                else
+                {
+                    return false;
+                }
+
+                if (Math.Abs((lastWrite - DateTime.UnixEpoch).TotalSeconds - entry.Value.GetDouble()) > 0.001)
+                {
+                    return false;
+                }
+            }
+            return true;
         }
         catch (Exception ex)
         {
-            return (false, $"测试Python环境失败: {ex.Message}");
+            _logger.LogWarning(ex, "读取Python环境缓存失败");
+            return false;
         }
     }
 
@@ -533,7 +606,7 @@ public class GogService : IGogService
     /// <summary>
     /// 获取GOG数据
     /// </summary>
-    private async Task<JsonDocument?> GetGogDataFromPython(string? tokensPath = null)
+    private async Task<JsonDocument?> GetGogDataFromPython(string? tokensPath = null, string extraArguments = "", string? taskId = null)
     {
         try
         {
@@ -545,8 +618,26 @@ public class GogService : IGogService
                 return null;
             }
 
-            var arguments = $"--tokens \"{tokenPath}\"";
-            var (exitCode, output, error) = await RunPythonScript("gog_get_data.py", arguments);
+            var outputPath = Path.Combine(_outputDirectory, $"gog_{Guid.NewGuid():N}.json");
+            var resume = ResumableTokens.ContainsKey(tokenPath) ? " --resume" : string.Empty;
+            var arguments = $"--tokens \"{tokenPath}\" --output \"{outputPath}\" --deadline {_deadlineSeconds}{resume} {extraArguments}".TrimEnd();
+            if (taskId != null)
+            {
+                // 导入任务写入各自的进度文件,同时进行的导入互不覆盖
+                arguments += $" --progress-file \"{GetProgressPath(taskId)}\"";
+            }
+            (int exitCode, string output, string error) run;
+            try
+            {
+                run = await RunPythonScript("gog_get_data.py", arguments);
+            }
+            catch (TimeoutException)
+            {
+                // 超时被终止时断点日志中保留了已完成的游戏,下一次采集从断点继续
+                ResumableTokens[tokenPath] = true;
+                throw;
+            }
+            var (exitCode, output, error) = run;
 
             _logger.LogInformation("Python脚本执行完成: ExitCode={ExitCode}", exitCode);
             
@@ -568,62 +659,76 @@ public class GogService : IGogService
             // 解析JSON输出
             try
             {
-                if (string.IsNullOrWhiteSpace(output))
+                JsonDocument doc;
+                if (File.Exists(outputPath))
                 {
-                    _logger.LogError("Python脚本没有输出任何内容,ExitCode={ExitCode}, Error={Error}", exitCode, error);
-                    return null;
+                    // 结果已写入输出文件:直接从文件流式解析,stdout只有一行状态
+                    await using (var stream = new FileStream(outputPath, FileMode.Open, FileAccess.Read, FileShare.Read,
+                        bufferSize: 81920, FileOptions.Asynchronous | FileOptions.SequentialScan))
+                    {
+                        _logger.LogDebug("从输出文件解析JSON,长度: {Length} 字节", stream.Length);
+                        doc = await JsonDocument.ParseAsync(stream);
+                    }
                 }
-                
-                // 清理输出:移除可能的调试信息行
-                var lines = output.Split(new[] { '\r', '\n' }, StringSplitOptions.RemoveEmptyEntries);
-                var jsonLines = new List<string>();
-                bool inJson = false;
-                
-                foreach (var line in lines)
+                else
                 {
-                    var trimmedLine = line.Trim();
-                    
-                    // 跳过调试信息行
-                    if (trimmedLine.StartsWith("INFO:") || 
-                        trimmedLine.StartsWith("WARNING:") || 
-                        trimmedLine.StartsWith("ERROR:") || 
-                        trimmedLine.StartsWith("AUTH_URL:") ||
-                        trimmedLine.StartsWith("DEBUG:"))
+                    if (string.IsNullOrWhiteSpace(output))
                     {
-                        continue;
+                        _logger.LogError("Python脚本没有输出任何内容,ExitCode={ExitCode}, Error={Error}", exitCode, error);
+                        return null;
                     }
                     
-                    // 检测JSON开始
-                    if (trimmedLine.StartsWith("{"))
-                    {
-                        inJson = true;
-                    }
+                    // 清理输出:移除可能的调试信息行
+                    var lines = output.Split(new[] { '\r', '\n' }, StringSplitOptions.RemoveEmptyEntries);
+                    var jsonLines = new List<string>();
+                    bool inJson = false;
                     
-                    // 收集JSON内容
-                    if (inJson)
+                    foreach (var line in lines)
                     {
-                        jsonLines.Add(line);
+                        var trimmedLine = line.Trim();
+                    
+                        // 跳过调试信息行
+                        if (trimmedLine.StartsWith("INFO:") || 
+                            trimmedLine.StartsWith("WARNING:") || 
+                            trimmedLine.StartsWith("ERROR:") || 
+                            trimmedLine.StartsWith("AUTH_URL:") ||
+                            trimmedLine.StartsWith("DEBUG:"))
+                        {
+                            continue;
+                        }
+                    
+                        // 检测JSON开始
+                        if (trimmedLine.StartsWith("{"))
+                        {
+                            inJson = true;
+                        }
+                    
+                        // 收集JSON内容
+                        if (inJson)
+                        {
+                            jsonLines.Add(line);
+                        }
                     }
-                }
-                
-                if (jsonLines.Count == 0)
-                {
-                    _logger.LogError("未找到有效的JSON输出,ExitCode={ExitCode}", exitCode);
-                    _logger.LogDebug("完整输出: {Output}", output);
-                    if (!string.IsNullOrEmpty(error))
+                    
+                    if (jsonLines.Count == 0)
                     {
-                        _logger.LogError("错误信息: {Error}", error);
+                        _logger.LogError("未找到有效的JSON输出,ExitCode={ExitCode}", exitCode);
+                        _logger.LogDebug("完整输出: {Output}", output);
+                        if (!string.IsNullOrEmpty(error))
+                        {
+                            _logger.LogError("错误信息: {Error}", error);
+                        }
+                        return null;
                     }
-                    return null;
+                    
+                    // 重新组合JSON字符串
+                    var jsonString = string.Join("\n", jsonLines);
+                    
+                    _logger.LogDebug("准备解析JSON,长度: {Length} 字符", jsonString.Length);
+                    
+                    doc = JsonDocument.Parse(jsonString);
                 }
                 
-                // 重新组合JSON字符串
-                var jsonString = string.Join("\n", jsonLines);
-                
-                _logger.LogDebug("准备解析JSON,长度: {Length} 字符", jsonString.Length);
-                
-                var doc = JsonDocument.Parse(jsonString);
-                
                 // 检查是否有错误信息
                 if (doc.RootElement.TryGetProperty("success", out var success) && !success.GetBoolean())
                 {
@@ -642,6 +747,19 @@ public class GogService : IGogService
                 }
                 
                 _logger.LogInformation("成功解析GOG数据JSON");
+
+                // 读取本地快照时没有采集,不改变断点状态
+                if (!doc.RootElement.TryGetProperty("snapshotAge", out _))
+                {
+                    if (doc.RootElement.TryGetProperty("partial", out var partial) && partial.ValueKind == JsonValueKind.True)
+                    {
+                        ResumableTokens[tokenPath] = true;
+                    }
+                    else
+                    {
+                        ResumableTokens.TryRemove(tokenPath, out _);
+                    }
+                }
                 return doc;
             }
             catch (JsonException ex)
@@ -658,6 +776,13 @@ public class GogService : IGogService
                 _logger.LogError(ex, "解析GOG数据时发生未预期的错误: ExitCode={ExitCode}", exitCode);
                 return null;
             }
+            finally
+            {
+                if (File.Exists(outputPath))
+                {
+                    File.Delete(outputPath);
+                }
+            }
         }
         catch (Exception ex)
         {
@@ -667,19 +792,141 @@ public class GogService : IGogService
     }
 
     /// <summary>
-    /// 导入GOG数据
+    /// 导入任务的进度文件路径
     /// </summary>
-    public async Task<GogImportResponseDto> ImportGogData(GogImportRequestDto request)
+    private string GetProgressPath(string taskId)
+    {
+        return Path.Combine(_progressDirectory, $"{taskId}.json");
+    }
+
+    /// <summary>
+    /// 读取导入任务的进度(阶段、已完成数量、预计剩余时间),任务结束后返回导入结果
+    /// </summary>
+    public async Task<GogImportResponseDto?> GetImportProgress(string taskId)
     {
         try
         {
-            _logger.LogInformation("开始导入GOG数据: gogUserId={GogUserId}", request.GogUserId);
+            if (CompletedImports.TryGetValue(taskId, out var completed))
+            {
+                return completed.Result;
+            }
 
-            var taskId = $"gog_import_{DateTime.UtcNow:yyyyMMdd_HHmmss}";
-            
+            // 任务ID会拼接为文件名,只接受导入时生成的格式
+            if (string.IsNullOrEmpty(taskId) || !taskId.All(c => char.IsAsciiLetterOrDigit(c) || c == '_'))
+            {
+                return null;
+            }
+
+            var progressPath = GetProgressPath(taskId);
+            if (!File.Exists(progressPath))
+            {
+                return null;
+            }
+
+            using var document = JsonDocument.Parse(await File.ReadAllTextAsync(progressPath));
+            if (!document.RootElement.TryGetProperty("sources", out var sources)
+                || !sources.TryGetProperty("gog", out var progress))
+            {
+                return null;
+            }
+
+            var phase = progress.GetProperty("phase").GetString() ?? string.Empty;
+            var done = progress.GetProperty("done").GetInt32();
+            var total = progress.GetProperty("total").ValueKind == JsonValueKind.Number
+                ? progress.GetProperty("total").GetInt32()
+                : (int?)null;
+            var eta = progress.GetProperty("eta").ValueKind == JsonValueKind.Number
+                ? progress.GetProperty("eta").GetDouble()
+                : 0;
+            var finished = progress.GetProperty("finished").GetBoolean();
+
+            // 采集已结束但结果尚未统计完成时仍视为进行中
+            return new GogImportResponseDto
+            {
+                TaskId = taskId,
+                Status = "processing",
+                Message = total.HasValue ? $"{phase} {done}/{total}" : phase,
+                EstimatedTime = finished ? 0 : (int)Math.Ceiling(eta),
+                Items = new GogImportItemsDto
+                {
+                    Games = phase == "games" || finished ? done : 0
+                }
+            };
+        }
+        catch (Exception ex)
+        {
+            _logger.LogWarning(ex, "读取采集进度失败");
+            return null;
+        }
+    }
+
+    /// <summary>
+    /// 导入GOG数据
+    /// 采集在后台运行,立即返回任务ID,调用方使用 GetImportProgress 轮询进度和结果
+    /// </summary>
+    public Task<GogImportResponseDto> ImportGogData(GogImportRequestDto request)
+    {
+        _logger.LogInformation("开始导入GOG数据: gogUserId={GogUserId}", request.GogUserId);
+
+        // 任务ID包含用户ID,进度文件按任务区分
+        var taskId = $"gog_import_{request.UserId}_{DateTime.UtcNow:yyyyMMddHHmmss}";
+        _ = Task.Run(async () =>
+        {
+            GogImportResponseDto result;
+            try
+            {
+                result = await RunImport(taskId);
+            }
+            catch (Exception ex)
+            {
+                result = new GogImportResponseDto
+                {
+                    TaskId = taskId,
+                    Status = "failed",
+                    Message = $"导入错误: {ex.Message}",
+                    EstimatedTime = 0,
+                    Items = new GogImportItemsDto()
+                };
+            }
+
+            foreach (var expired in CompletedImports.Where(entry => DateTime.UtcNow - entry.Value.FinishedAt > CompletedImportRetention))
+            {
+                CompletedImports.TryRemove(expired.Key, out _);
+            }
+            CompletedImports[taskId] = (result, DateTime.UtcNow);
+
+            // 结果已保存,进度文件不再需要
+            try
+            {
+                File.Delete(GetProgressPath(taskId));
+            }
+            catch (IOException ex)
+            {
+                _logger.LogDebug(ex, "删除进度文件失败: {TaskId}", taskId);
+            }
+        });
+
+        // 预计时间取采集脚本的截止时间,之后以进度文件中的估计为准
+        return Task.FromResult(new GogImportResponseDto
+        {
+            TaskId = taskId,
+            Status = "processing",
+            Message = "导入已开始,请使用任务ID查询进度",
+            EstimatedTime = _deadlineSeconds,
+            Items = new GogImportItemsDto()
+        });
+    }
+
+    /// <summary>
+    /// 执行一次导入(采集并统计)
+    /// </summary>
+    private async Task<GogImportResponseDto> RunImport(string taskId)
+    {
+        try
+        {
             // 获取GOG数据
             _logger.LogInformation("正在调用Python脚本获取GOG数据...");
-            var gogData = await GetGogDataFromPython();
+            var gogData = await GetGogDataFromPython(taskId: taskId);
             
             if (gogData == null)
             {
@@ -750,16 +997,31 @@ public class GogService : IGogService
             _logger.LogInformation("统计完成: {GamesCount} 个游戏, {AchievementsCount} 个成就", 
                 gamesCount, achievementsCount);
 
+            // 截止时间内未获取全部游戏时返回部分结果,未获取的游戏在重新导入时从断点继续
+            var partial = gogData.RootElement.TryGetProperty("partial", out var partialElement)
+                && partialElement.ValueKind == JsonValueKind.True;
+            var pendingCount = gogData.RootElement.TryGetProperty("pendingGames", out var pendingGames)
+                && pendingGames.ValueKind == JsonValueKind.Array
+                ? pendingGames.GetArrayLength()
+                : 0;
+            if (partial)
+            {
+                _logger.LogWarning("GOG导入未完成: {PendingCount} 个游戏未获取", pendingCount);
+            }
+
             return new GogImportResponseDto
             {
                 TaskId = taskId,
-                Status = "completed",
-                Message = $"成功导入 {gamesCount} 个游戏和 {achievementsCount} 个成就",
+                Status = partial ? "partial" : "completed",
+                Message = partial
+                    ? $"已导入 {gamesCount} 个游戏和 {achievementsCount} 个成就,{pendingCount} 个游戏未获取,请稍后重新导入"
+                    : $"成功导入 {gamesCount} 个游戏和 {achievementsCount} 个成就",
                 EstimatedTime = 0,
                 Items = new GogImportItemsDto
                 {
                     Games = gamesCount,
-                    Achievements = achievementsCount
+                    Achievements = achievementsCount,
+                    Pending = pendingCount
                 }
             };
         }
@@ -779,7 +1041,7 @@ public class GogService : IGogService
         {
             _logger.LogInformation("获取GOG用户信息: gogUserId={GogUserId}", gogUserId);
 
-            var gogData = await GetGogDataFromPython();
+            var gogData = await GetGogDataFromPython(extraArguments: SnapshotReadArguments());
             
             if (gogData == null)
             {
@@ -830,7 +1092,7 @@ public class GogService : IGogService
         {
             _logger.LogInformation("获取GOG游戏信息: gogGameId={GogGameId}", gogGameId);
 
-            var gogData = await GetGogDataFromPython();
+            var gogData = await GetGogDataFromPython(extraArguments: SnapshotReadArguments(gogGameId));
             
             if (gogData == null)
             {
@@ -896,7 +1158,7 @@ public class GogService : IGogService
         {
             _logger.LogInformation("获取GOG用户游戏列表: gogUserId={GogUserId}", gogUserId);
 
-            var gogData = await GetGogDataFromPython();
+            var gogData = await GetGogDataFromPython(extraArguments: SnapshotReadArguments());
             
             if (gogData == null)
             {
@@ -9,7 +9,7 @@ namespace PlayLinker.Services;
 public interface IGogService
 {
     /// <summary>
-    /// 导入GOG数据
+    /// 导入GOG数据,在后台运行并立即返回任务ID
     /// </summary>
     Task<GogImportResponseDto> ImportGogData(GogImportRequestDto request);
 
@@ -37,6 +37,11 @@ public interface IGogService
     /// 检查令牌状态
     /// </summary>
     Task<GogAuthResponseDto> CheckTokenStatus(string? tokensPath = null);
+
+    /// <summary>
+    /// 获取导入任务的进度,任务结束后返回导入结果
+    /// </summary>
+    Task<GogImportResponseDto?> GetImportProgress(string taskId);
 }
 
 
@@ -9,7 +9,7 @@ namespace PlayLinker.Services;
 public interface IXboxService
 {
     /// <summary>
-    /// 导入Xbox数据
+    /// 导入Xbox数据，在后台运行并立即返回任务ID
     /// </summary>
     Task<XboxImportResponseDto> ImportXboxData(XboxImportRequestDto request);
 
@@ -42,5 +42,10 @@ public interface IXboxService
     /// 检查令牌状态
     /// </summary>
     Task<XboxAuthResponseDto> CheckTokenStatus(string? tokensPath = null);
+
+    /// <summary>
+    /// 获取导入任务的进度，任务结束后返回导入结果
+    /// </summary>
+    Task<XboxImportResponseDto?> GetImportProgress(string taskId);
 }
 
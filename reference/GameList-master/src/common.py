@@ -2,6 +2,8 @@ __all__ = [
     'eprint',
     'jprint',
     'lines',
+    'stream_lines',
+    'make_session',
     'fetch_url',
     'format_time',
     'format_datetime',
@@ -9,10 +11,10 @@ __all__ = [
 ]
 
 import sys
-import time
 import requests
 import json
 from datetime import datetime
+from retry import get_with_retry
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:120.0) Gecko/20100101 Firefox/120.0'}
@@ -57,14 +59,36 @@ def lines(path):
         return []
 
 
-def fetch_url(url, headers=headers, try_times=5, sleep_interval=1):
-    if try_times == 0:
-        return None
+def stream_lines(path):
+    # 逐行读取, 适合很大的列表文件
     try:
-        return requests.get(url, headers=headers)
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
     except Exception:
-        time.sleep(sleep_interval)
-        return fetch_url(url, headers=headers, try_times=try_times - 1)
+        return
+
+
+def make_session(pool_size=10):
+    # 多线程共享的会话, 复用连接
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(headers)
+    return session
+
+
+def fetch_url(url, headers=headers, try_times=5, sleep_interval=1, session=None, timeout=30):
+    # 网络错误和 429/5xx 按指数退避重试, 429/503 遵守 Retry-After
+    # 重试用尽后返回最后一次响应(由调用方检查状态码), 网络错误返回None
+    try:
+        return get_with_retry(lambda: (session or requests).get(url, headers=headers, timeout=timeout),
+                              retries=try_times - 1, base=sleep_interval)
+    except requests.RequestException:
+        return None
 
 
 def format_time(timestamp):
@@ -1,13 +1,109 @@
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from common import *
 
+STATS_URL = 'https://www.gog.com/u/{user}/games/stats?sort=total_playtime&order=desc&page={page}'
 
-def fetch(user):
-    url = f'https://www.gog.com/u/{user}/games/stats?sort=total_playtime&order=desc&page=1'
-    r = fetch_url(url)
-    if r is None:
+
+def fetch_page(user, page, session=None):
+    r = fetch_url(STATS_URL.format(user=user, page=page), session=session)
+    if r is None or r.status_code != 200:
+        eprint(f'{user}: page {page} failed')
+        return None
+    return r.json()
+
+
+def crawl(user, workers=8, session=None):
+    # 第一页返回总页数, 其余页并发获取, 按页序逐条产出
+    # 任意一页失败都抛出IOError, 不输出缺页的不完整列表
+    first = fetch_page(user, 1, session)
+    if first is None:
+        raise IOError(f'{user}: stats unavailable')
+    yield from first['_embedded']['items']
+    pages = first.get('pages', 1)
+    if pages < 2:
         return
-    items = r.json()['_embedded']['items']
-    jprint([item['game']['title'] for item in items])
+    with ThreadPoolExecutor(max_workers=min(workers, pages - 1)) as pool:
+        for page, data in enumerate(pool.map(lambda page: fetch_page(user, page, session), range(2, pages + 1)), 2):
+            if data is None:
+                raise IOError(f'{user}: page {page} of {pages} failed')
+            yield from data['_embedded']['items']
+
+
+def playtime(item):
+    # stats 以用户ID为键, 公开资料只包含该用户自己的统计
+    for stats in (item.get('stats') or {}).values():
+        return stats.get('playtime', 0)
+    return 0
+
+
+def games(user, workers=8, session=None):
+    for item in crawl(user, workers, session):
+        yield {'title': item['game']['title'], 'playtime': playtime(item)}
+
+
+def fetch(user):
+    try:
+        jprint(list(games(user)))
+    except IOError as e:
+        eprint(e)
+
+
+def finished_users(output_path):
+    # 已成功写入结果的用户, 用于断点续爬
+    done = set()
+    for line in stream_lines(output_path):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if 'error' not in record:
+            done.add(record['user'])
+    return done
+
+
+def crawl_user(user, session):
+    # 任意一页失败时记录错误, 该用户不计入已完成, 续爬时重新抓取
+    try:
+        return {'user': user, 'games': list(games(user, workers=2, session=session))}
+    except Exception as e:
+        return {'user': user, 'error': str(e)}
+
+
+def bulk(users_path, output_path, workers=16):
+    # 流式读取用户名, 有界线程池并发抓取, 每完成一个用户追加一行结果
+    done = finished_users(output_path)
+    if done:
+        eprint(f'resume: skip {len(done)} users')
+    session = make_session(workers * 2)
+    failed = 0
+
+    def write(futures):
+        nonlocal failed
+        for future in futures:
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            if 'error' in record:
+                failed += 1
+                eprint(record['error'])
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, open(output_path, 'a', encoding='utf-8') as out:
+        pending = set()
+        for user in stream_lines(users_path):
+            if user in done:
+                continue
+            pending.add(pool.submit(crawl_user, user, session))
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                write(finished)
+        write(wait(pending).done)
+    if failed:
+        eprint(f'{failed} users failed, run again to retry them')
 
 
-fetch('liphx')
+if len(sys.argv) > 3 and sys.argv[1] == '--bulk':
+    bulk(sys.argv[2], sys.argv[3], int(sys.argv[4]) if len(sys.argv) > 4 else 16)
+else:
+    fetch(sys.argv[1] if len(sys.argv) > 1 else 'liphx')
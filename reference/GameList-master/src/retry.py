@@ -0,0 +1,66 @@
+__all__ = [
+    'parse_retry_after',
+    'backoff',
+    'get_with_retry',
+]
+
+# GET 请求的重试: 指数退避加随机抖动, 429/503 遵守 Retry-After
+# 策略与 Backend/Python/http_retry.py 相同, 这里只保留本工具需要的部分, 不依赖仓库的其他目录
+
+import time
+import random
+import requests
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def parse_retry_after(value):
+    # Retry-After 可以是秒数或HTTP日期, 无法解析时返回None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff(attempt, base=1, cap=30, retry_after=None):
+    # 第attempt次重试前等待 [0, min(cap, base * 2^attempt)] 之间的随机秒数(full jitter)
+    # 有 Retry-After 时至少等待该时长, 超过cap时返回None(不再重试)
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        if retry_after > cap:
+            return None
+        delay = max(delay, retry_after)
+    return delay
+
+
+def get_with_retry(send, retries=4, base=1, cap=30):
+    # send 发出一次GET请求并返回响应
+    # 连接错误、超时和 429/5xx 最多重试retries次; 可重试的状态码在重试用尽后原样返回, 由调用方检查
+    # 其他网络错误和重试用尽的网络错误抛出
+    attempt = 0
+    while True:
+        try:
+            response = send()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= retries:
+                raise
+            delay = backoff(attempt, base, cap)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            delay = backoff(attempt, base, cap, parse_retry_after(response.headers.get('Retry-After')))
+            if delay is None:
+                return response
+        time.sleep(delay)
+        attempt += 1